@@ -21,7 +21,7 @@ from flask import Blueprint, request, jsonify, current_app
 import logging
 
 from ..auth.tokens import TokenManager
-from ..auth.password import verify_password
+from ..auth.password import verify_password, needs_rehash, hash_password
 from ..config.constants import AUTH_ENABLED, DEFAULT_ADMIN_USERNAME
 
 logger = logging.getLogger(__name__)
@@ -87,6 +87,11 @@ def login():
         if not stored_hash or not verify_password(password, stored_hash):
             return jsonify({"error": "Invalid credentials"}), 401
         
+        # Upgrade legacy SHA-256 hashes now that the plain password is known
+        if needs_rehash(stored_hash):
+            config_manager.set("admin_password_hash", hash_password(password), save=True)
+            logger.info("Upgraded admin password hash to scrypt")
+        
         # Generate token with OAuth 2.0 format
         access_token, created_at = token_manager.create_token()
         expires_in = token_manager.expires_in
@@ -132,7 +137,6 @@ def change_password():
         
         config_manager = current_app.config_manager
         token_manager = current_app.token_manager
-        from ..auth.password import hash_password
         
         config = config_manager.main
         # Verify old password
@@ -163,7 +167,6 @@ def change_credentials():
         
         config_manager = current_app.config_manager
         token_manager = current_app.token_manager
-        from ..auth.password import hash_password
         
         config = config_manager.main
         
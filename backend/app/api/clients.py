@@ -87,19 +87,19 @@ def get_clients():
                 # Create a map of public_key -> peer stats
                 peer_stats_map = {}
                 for peer in stats["peers"]:
-                    peer_stats_map[peer.get("public_key")] = peer
+                    peer_stats_map[peer.public_key] = peer
                 
-                # Add stats to each client and save latest_handshake to DB
-                config_manager = current_app.config_manager
+                # Add stats to each client and collect newer latest_handshake values
+                newer_handshakes = {}
                 for username, client_data in clients.items():
                     public_key = client_data.get('public_key')
                     peer_stats = peer_stats_map.get(public_key)
                     
                     if peer_stats:
-                        client_data['is_connected'] = peer_stats.get('is_connected', False)
-                        client_data['rx_bytes'] = peer_stats.get('transfer_rx_bytes', 0) or 0
-                        client_data['tx_bytes'] = peer_stats.get('transfer_tx_bytes', 0) or 0
-                        new_handshake = peer_stats.get('latest_handshake', 0)
+                        client_data['is_connected'] = peer_stats.is_connected
+                        client_data['rx_bytes'] = peer_stats.transfer_rx_bytes
+                        client_data['tx_bytes'] = peer_stats.transfer_tx_bytes
+                        new_handshake = peer_stats.latest_handshake
                         # Get stored value before updating
                         stored_handshake = client_data.get('latest_handshake', 0)
                         
@@ -107,8 +107,7 @@ def get_clients():
                         # If new_handshake is 0, it means no handshake yet, so keep stored value
                         if new_handshake > stored_handshake:
                             client_data['latest_handshake'] = new_handshake
-                            # Save latest_handshake to database if it's newer
-                            config_manager.set_client(username, client_data, save=True)
+                            newer_handshakes[username] = new_handshake
                         else:
                             # Keep stored value, don't overwrite with 0 or older value
                             pass
@@ -118,6 +117,9 @@ def get_clients():
                         client_data['tx_bytes'] = 0
                         # Use stored latest_handshake from DB (already loaded in client_data)
                         # Don't overwrite it - it's already there from database
+                
+                # Save all newer latest_handshake values to DB in one transaction
+                config_manager.update_handshakes(newer_handshakes)
             else:
                 # No stats available (WireGuard not running)
                 # Use stored latest_handshake from DB (already loaded in client_data)
@@ -230,18 +232,18 @@ def get_client(username):
                 stored_handshake = client.get('latest_handshake', 0)
                 
                 for peer in stats["peers"]:
-                    if peer.get("public_key") == public_key:
-                        client['is_connected'] = peer.get('is_connected', False)
-                        client['rx_bytes'] = peer.get('transfer_rx_bytes', 0) or 0
-                        client['tx_bytes'] = peer.get('transfer_tx_bytes', 0) or 0
-                        new_handshake = peer.get('latest_handshake', 0)
+                    if peer.public_key == public_key:
+                        client['is_connected'] = peer.is_connected
+                        client['rx_bytes'] = peer.transfer_rx_bytes
+                        client['tx_bytes'] = peer.transfer_tx_bytes
+                        new_handshake = peer.latest_handshake
                         
                         # Only update latest_handshake if new value is greater (newer) than stored
                         # If new_handshake is 0, it means no handshake yet, so keep stored value
                         if new_handshake > stored_handshake:
                             client['latest_handshake'] = new_handshake
-                            # Save to DB if newer
-                            config_manager.set_client(username, client, save=True)
+                            # Save to DB if newer (without touching the client version)
+                            config_manager.update_handshakes({username: new_handshake})
                         # else: keep stored value, don't overwrite with 0 or older value
                         break
                 else:
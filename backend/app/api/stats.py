@@ -19,6 +19,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from flask import Blueprint, request, jsonify, current_app, Response
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from ..config.constants import APP_VERSION
 
@@ -26,6 +27,9 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint('stats', __name__)
 
+# Shared worker threads for collecting peer stats while /status checks the interface
+_status_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="status-stats")
+
 
 def require_auth(f):
     """Decorator to require authentication"""
@@ -99,13 +103,27 @@ def require_auth_or_metrics(f):
     return decorated_function
 
 
+def _count_connected_clients(wg_interface, clients):
+    """Count peers with a recent handshake, or 0 if stats are unavailable"""
+    from ..wireguard.stats import WireGuardStats
+    
+    try:
+        stats = WireGuardStats(wg_interface).get_stats(clients)
+        if stats and stats.get("peers"):
+            return sum(
+                1 for peer in stats["peers"] 
+                if peer.is_connected
+            )
+    except Exception as e:
+        logger.warning(f"Failed to get connected clients count: {e}")
+    return 0
+
+
 @bp.route('/status', methods=['GET'])
 @require_auth
 def get_status():
     """Get server status including WireGuard and obfuscator status"""
     try:
-        from ..wireguard.stats import WireGuardStats
-        
         config_manager = current_app.config_manager
         wg_manager = current_app.wg_manager
         obfuscator_manager = current_app.obfuscator_manager
@@ -113,23 +131,21 @@ def get_status():
         external_port = current_app.external_port
         
         config = config_manager.main
-        wg_status = wg_manager.status()
+        if config.get('enabled', True):
+            # Run the "wg show" status check and the stats dump side by side
+            connected_future = _status_executor.submit(
+                _count_connected_clients, wg_manager.wg_interface, config_manager.clients
+            )
+            wg_status = wg_manager.status()
+            connected_clients_count = connected_future.result()
+            # Connected clients only count while the interface is up
+            if not wg_status["running"]:
+                connected_clients_count = 0
+        else:
+            wg_status = wg_manager.status()
+            connected_clients_count = 0
         obfuscator_status = obfuscator_manager.status(config.get('obfuscation', False))
         
-        # Count connected clients
-        connected_clients_count = 0
-        if wg_status["running"]:
-            try:
-                stats_collector = WireGuardStats(wg_manager.wg_interface)
-                stats = stats_collector.get_stats(config_manager.clients)
-                if stats and stats.get("peers"):
-                    connected_clients_count = sum(
-                        1 for peer in stats["peers"] 
-                        if peer.get("is_connected", False)
-                    )
-            except Exception as e:
-                logger.warning(f"Failed to get connected clients count: {e}")
-        
         return jsonify({
             "external_ip": external_ip,
             "external_port": external_port,
@@ -171,6 +187,7 @@ def get_stats():
         
         if stats is None:
             return jsonify({"error": "WireGuard interface not found or not running"}), 503
+        stats["peers"] = [peer._asdict() for peer in stats["peers"]]
         return jsonify(stats)
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
@@ -201,8 +218,8 @@ def get_client_stats(username):
         
         # Find peer by public key
         for peer in stats.get("peers", []):
-            if peer.get("public_key") == public_key:
-                return jsonify(peer)
+            if peer.public_key == public_key:
+                return jsonify(peer._asdict())
         
         # Peer not found in active connections
         return jsonify({
@@ -262,7 +279,7 @@ def _collect_wireguard_peer_map(config_manager, wg_manager):
         stats = stats_collector.get_stats(config_manager.clients)
         if stats and stats.get("peers"):
             for peer in stats["peers"]:
-                username = peer.get("client_name")
+                username = peer.client_name
                 if username:
                     peer_map[username] = peer
     except Exception as e:
@@ -295,7 +312,7 @@ def _get_system_metrics_lines(config_manager, wg_manager, obfuscator_manager, pe
     )
     
     connected_clients = sum(
-        1 for peer in peer_map.values() if peer.get('is_connected', False)
+        1 for peer in peer_map.values() if peer.is_connected
     )
     
     return [
@@ -309,10 +326,13 @@ def _get_system_metrics_lines(config_manager, wg_manager, obfuscator_manager, pe
 def _get_client_metrics_lines(username, peer_map):
     """Generate Prometheus metrics lines for a single client"""
     label = _sanitize_metric_label(username)
-    peer_stats = peer_map.get(username, {})
-    connected = 1 if peer_stats.get('is_connected') else 0
-    rx_bytes = int(peer_stats.get('transfer_rx_bytes', 0) or 0)
-    tx_bytes = int(peer_stats.get('transfer_tx_bytes', 0) or 0)
+    peer_stats = peer_map.get(username)
+    if peer_stats:
+        connected = 1 if peer_stats.is_connected else 0
+        rx_bytes = peer_stats.transfer_rx_bytes
+        tx_bytes = peer_stats.transfer_tx_bytes
+    else:
+        connected = rx_bytes = tx_bytes = 0
     
     return [
         f"wg_client_connected{{client_id=\"{label}\"}} {connected}",
@@ -324,10 +344,7 @@ def _get_client_metrics_lines(username, peer_map):
 def _get_all_clients_metrics_lines(config_manager, peer_map):
     """Generate Prometheus metrics lines for all clients"""
     lines = []
-    for username in sorted(config_manager.clients.keys()):
-        client_data = config_manager.get_client(username)
-        if not client_data:
-            continue
+    for username in sorted(config_manager.clients):
         lines.extend(_get_client_metrics_lines(username, peer_map))
     return lines
 
@@ -18,13 +18,15 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """System configuration API endpoints"""
 
 import os
-import subprocess
 import logging
 import time
 from datetime import datetime
+from functools import wraps
 from flask import Blueprint, request, jsonify, current_app
 import pytz
 
+from ..config.constants import AUTH_ENABLED
+
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('system', __name__)
@@ -32,9 +34,6 @@ bp = Blueprint('system', __name__)
 
 def require_auth(f):
     """Decorator to require authentication"""
-    from functools import wraps
-    from ..config.constants import AUTH_ENABLED
-
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if not AUTH_ENABLED:
@@ -56,10 +55,13 @@ def require_auth(f):
 def get_current_timezone():
     """Get current system timezone"""
     try:
-        with open('/etc/timezone', 'r') as f:
-            timezone_name = f.read().strip()
-        return timezone_name
-    except (FileNotFoundError, IOError) as e:
+        fd = os.open('/etc/timezone', os.O_RDONLY)
+        try:
+            data = os.read(fd, 64)
+        finally:
+            os.close(fd)
+        return data.decode().strip()
+    except OSError as e:
         logger.error(f"Failed to read /etc/timezone: {e}")
         return "UTC"
 
@@ -141,9 +143,19 @@ def set_system_timezone(timezone_name):
         with open('/etc/timezone', 'w') as f:
             f.write(f"{timezone_name}\n")
 
-        # Update /etc/localtime symlink
-        subprocess.run(['ln', '-sf', zoneinfo_path, '/etc/localtime'],
-                      check=True, capture_output=True)
+        # Update /etc/localtime symlink atomically
+        tmp_link = f"/etc/localtime.tmp.{os.getpid()}"
+        try:
+            os.symlink(zoneinfo_path, tmp_link)
+            os.replace(tmp_link, '/etc/localtime')
+        except OSError as e:
+            try:
+                os.unlink(tmp_link)
+            except OSError:
+                pass
+            error_msg = f"Failed to update timezone symlink: {e}"
+            logger.error(error_msg)
+            return False, error_msg
 
         # Save timezone to database
         from ..database import set_config_value
@@ -159,10 +171,6 @@ def set_system_timezone(timezone_name):
 
         return True, None
 
-    except subprocess.CalledProcessError as e:
-        error_msg = f"Failed to update timezone symlink: {e.stderr.decode().strip()}"
-        logger.error(error_msg)
-        return False, error_msg
     except Exception as e:
         error_msg = f"Failed to set timezone: {str(e)}"
         logger.error(error_msg)
@@ -18,28 +18,71 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """Password hashing and verification utilities"""
 
 import hashlib
+import hmac
+import secrets
 import logging
 
 logger = logging.getLogger(__name__)
 
+# scrypt parameters (N=2^15, r=8 needs 32 MB of memory per hash)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+SCRYPT_SALT_SIZE = 16
+# hashlib.scrypt() refuses to use more than 32 MB by default
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+# Prefix of hashes in "scrypt$<salt hex>$<hash hex>" format
+SCRYPT_PREFIX = "scrypt$"
+
+
+def _scrypt(password: str, salt: bytes) -> bytes:
+    """Derive a key from the password with scrypt"""
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=SCRYPT_N,
+        r=SCRYPT_R,
+        p=SCRYPT_P,
+        maxmem=SCRYPT_MAXMEM,
+        dklen=SCRYPT_DKLEN
+    )
+
 
 def hash_password(password: str) -> str:
     """
-    Hash password using SHA-256
+    Hash password using scrypt with a random salt
     
     Args:
         password: Plain text password
         
     Returns:
-        Hexadecimal hash of the password
+        Hash in "scrypt$<salt hex>$<hash hex>" format
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    salt = secrets.token_bytes(SCRYPT_SALT_SIZE)
+    return f"{SCRYPT_PREFIX}{salt.hex()}${_scrypt(password, salt).hex()}"
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Check if a stored hash uses the legacy unsalted SHA-256 format
+    
+    Args:
+        password_hash: Stored password hash
+        
+    Returns:
+        True if the hash should be replaced with hash_password() output
+    """
+    return not password_hash.startswith(SCRYPT_PREFIX)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     """
     Verify password against hash
     
+    Accepts scrypt hashes and legacy SHA-256 hex digests.
+    
     Args:
         password: Plain text password to verify
         password_hash: Stored password hash
@@ -47,5 +90,22 @@ def verify_password(password: str, password_hash: str) -> bool:
     Returns:
         True if password matches hash, False otherwise
     """
-    return hash_password(password) == password_hash
-
+    if not password_hash:
+        return False
+    
+    if password_hash.startswith(SCRYPT_PREFIX):
+        try:
+            salt_hex, _, hash_hex = password_hash[len(SCRYPT_PREFIX):].partition("$")
+            salt = bytes.fromhex(salt_hex)
+            expected = bytes.fromhex(hash_hex)
+        except ValueError:
+            logger.warning("Malformed scrypt password hash")
+            return False
+        if len(expected) != SCRYPT_DKLEN:
+            return False
+        return hmac.compare_digest(_scrypt(password, salt), expected)
+    
+    # Legacy SHA-256 hex digest is always 64 characters long
+    if len(password_hash) != 64:
+        return False
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
@@ -19,11 +19,11 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import secrets
 import logging
+import queue
+import threading
 from datetime import datetime
 from functools import wraps
 
-from flask import request, jsonify
-
 from ..config.constants import TOKEN_EXPIRES_IN, AUTH_ENABLED
 from ..database import (
     create_token, get_token, delete_token, delete_all_tokens,
@@ -32,12 +32,42 @@ from ..database import (
 
 logger = logging.getLogger(__name__)
 
+# Number of tokens generated in advance
+TOKEN_POOL_SIZE = 32
+
+_token_pool: queue.Queue = queue.Queue(maxsize=TOKEN_POOL_SIZE)
+_token_pool_thread = None
+_token_pool_lock = threading.Lock()
+
+
+def _fill_token_pool() -> None:
+    """Keep the token pool full (runs in a background thread)"""
+    while True:
+        # Blocks while the pool is full
+        _token_pool.put(secrets.token_urlsafe(32))
+
+
+def _start_token_pool() -> None:
+    """Start the token pool filler thread if it is not running yet"""
+    global _token_pool_thread
+    with _token_pool_lock:
+        if _token_pool_thread is None:
+            _token_pool_thread = threading.Thread(
+                target=_fill_token_pool,
+                name="token-pool",
+                daemon=True
+            )
+            _token_pool_thread.start()
+
 
 class TokenManager:
     """Manages authentication tokens with SQLite persistence"""
     
+    __slots__ = ('expires_in',)
+    
     def __init__(self, expires_in: int = TOKEN_EXPIRES_IN):
         self.expires_in = expires_in
+        _start_token_pool()
         # Cleanup expired tokens on initialization
         deleted = cleanup_expired_tokens()
         if deleted > 0:
@@ -45,7 +75,10 @@ class TokenManager:
     
     def generate_token(self) -> str:
         """Generate a secure random token"""
-        return secrets.token_urlsafe(32)
+        try:
+            return _token_pool.get_nowait()
+        except queue.Empty:
+            return secrets.token_urlsafe(32)
     
     def create_token(self) -> tuple[str, datetime]:
         """
@@ -105,6 +138,9 @@ def require_auth(f):
     Checks for Bearer token in Authorization header and validates it.
     If AUTH_ENABLED is False, authentication is bypassed.
     """
+    # Imported here so that TokenManager can be used without loading Flask
+    from flask import request, jsonify
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if not AUTH_ENABLED:
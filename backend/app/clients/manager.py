@@ -17,24 +17,37 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """Client management operations"""
 
-import subprocess
 import ipaddress
 import logging
-from typing import Dict, Tuple, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Optional
 
 from ..config.constants import DEFAULT_CLIENT_OBFUSCATOR_PORT
 from ..exceptions import ClientAlreadyExistsError, ClientNotFoundError, ServiceError
 from ..wireguard.manager import WireGuardManager
 from ..wireguard.config import WireGuardConfigGenerator
+from ..wireguard.keys import generate_key_pair
 from ..obfuscator.config import ObfuscatorConfigGenerator
 from ..obfuscator.manager import ObfuscatorManager
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of generated client configuration files kept in memory
+CONFIG_CACHE_SIZE = 256
+
 
 class ClientManager:
     """Manages WireGuard clients"""
     
+    __slots__ = (
+        'config_manager',
+        'wg_manager',
+        'obfuscator_manager',
+        '_config_cache',
+        '_config_cache_lock',
+    )
+    
     def __init__(
         self,
         config_manager,
@@ -44,6 +57,25 @@ class ClientManager:
         self.config_manager = config_manager
         self.wg_manager = wg_manager
         self.obfuscator_manager = obfuscator_manager
+        # Generated client configs keyed by (kind, username, version, external_ip, external_port)
+        self._config_cache: OrderedDict = OrderedDict()
+        self._config_cache_lock = threading.Lock()
+    
+    def _get_cached_config(self, key: tuple) -> Optional[str]:
+        """Get generated client config from cache"""
+        with self._config_cache_lock:
+            content = self._config_cache.get(key)
+            if content is not None:
+                self._config_cache.move_to_end(key)
+            return content
+    
+    def _cache_config(self, key: tuple, content: str) -> None:
+        """Store generated client config in cache, evicting the oldest entries"""
+        with self._config_cache_lock:
+            self._config_cache[key] = content
+            self._config_cache.move_to_end(key)
+            while len(self._config_cache) > CONFIG_CACHE_SIZE:
+                self._config_cache.popitem(last=False)
     
     def generate_key_pair(self) -> Tuple[str, str]:
         """
@@ -56,28 +88,10 @@ class ClientManager:
             ServiceError: If key generation fails
         """
         try:
-            # Generate private key
-            response = subprocess.run(
-                ["wg", "genkey"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            private = response.stdout.splitlines()[0]
-            
-            # Generate public key from private
-            response_public = subprocess.run(
-                ["wg", "pubkey"],
-                input=private,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            public = response_public.stdout.splitlines()[0]
-            
+            private, public = generate_key_pair()
             logger.debug("Generated new key pair")
             return private, public
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             logger.error(f"Failed to generate key pair: {e}")
             raise ServiceError("Failed to generate server keys")
     
@@ -209,17 +223,24 @@ class ClientManager:
         else:
             exclude = exclude_subnets
         
-        final_ranges = []
-        # Exclude each subnet
+        remaining = list(allowed)
+        # Subtract each excluded subnet from what is left after the previous ones
         for exclude_subnet in exclude:
-            for net in allowed:
-                if exclude_subnet.overlaps(net):
-                    subnets = list(net.address_exclude(exclude_subnet))
-                    final_ranges.extend(subnets)
-                else:
-                    final_ranges.append(net)
-        
-        return [str(subnet) for subnet in final_ranges]
+            new_remaining = []
+            for net in remaining:
+                if not exclude_subnet.overlaps(net):
+                    new_remaining.append(net)
+                elif not net.subnet_of(exclude_subnet):
+                    new_remaining.extend(net.address_exclude(exclude_subnet))
+                # else: the whole network is excluded
+            remaining = new_remaining
+
+        # collapse_addresses() does not accept mixed address families
+        ipv4 = [net for net in remaining if net.version == 4]
+        ipv6 = [net for net in remaining if net.version == 6]
+        collapsed = list(ipaddress.collapse_addresses(ipv4)) + list(ipaddress.collapse_addresses(ipv6))
+
+        return [str(subnet) for subnet in collapsed]
     
     def get_client_wg_config(
         self,
@@ -244,6 +265,12 @@ class ClientManager:
         if not self.config_manager.has_client(username):
             raise ClientNotFoundError(f"Client {username} does not exist")
         
+        cache_key = ("wireguard", username, self.config_manager.get_version(username),
+                     external_ip, external_port)
+        cached = self._get_cached_config(cache_key)
+        if cached is not None:
+            return cached
+        
         config = self.config_manager.main
         client = self.config_manager.get_client(username)
         
@@ -258,7 +285,7 @@ class ClientManager:
         else:
             allowed_ips = client["allowed_ips"]
         
-        return WireGuardConfigGenerator.generate_client_config(
+        content = WireGuardConfigGenerator.generate_client_config(
             config=config,
             client=client,
             external_ip=external_ip,
@@ -267,6 +294,8 @@ class ClientManager:
             allowed_ips=allowed_ips,
             default_obfuscator_port=DEFAULT_CLIENT_OBFUSCATOR_PORT
         )
+        self._cache_config(cache_key, content)
+        return content
     
     def get_client_obfuscator_config(
         self,
@@ -291,10 +320,16 @@ class ClientManager:
         if not self.config_manager.has_client(username):
             raise ClientNotFoundError(f"Client {username} does not exist")
         
+        cache_key = ("obfuscator", username, self.config_manager.get_version(username),
+                     external_ip, external_port)
+        cached = self._get_cached_config(cache_key)
+        if cached is not None:
+            return cached
+        
         config = self.config_manager.main
         client = self.config_manager.get_client(username)
         
-        return ObfuscatorConfigGenerator.generate_client_config(
+        content = ObfuscatorConfigGenerator.generate_client_config(
             client=client,
             external_ip=external_ip,
             external_port=external_port,
@@ -303,4 +338,6 @@ class ClientManager:
             masking_forced=config.get('masking_forced', False),
             verbosity_level=config.get('verbosity_level', 'INFO')
         )
+        self._cache_config(cache_key, content)
+        return content
 
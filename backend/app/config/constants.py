@@ -56,6 +56,9 @@ MASKING_TYPES_NAMES = {
 # Token expiration
 TOKEN_EXPIRES_IN = 86400  # 24 hours in seconds
 
+# Number of obfuscator output lines kept in memory (bounds log memory usage)
+OBFUSCATOR_LOG_MAX_LINES = int(os.getenv("OBFUSCATOR_LOG_MAX_LINES", "10000"))
+
 # Application version (with 'v' prefix)
 # Add backend directory to path to import version
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,14 +18,15 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """Configuration manager for loading and saving configuration using SQLite"""
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from .constants import DEFAULT_WG_CONFIG
 from ..exceptions import ConfigError
 from ..database import (
     init_database,
     get_all_config, get_config_value, set_config_value,
-    get_all_clients, get_client, save_client, delete_client, client_exists
+    get_all_clients, get_client, save_client, save_clients, delete_client,
+    update_latest_handshakes
 )
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,9 @@ class ConfigManager:
         
         self.main: Dict[str, Any] = {}
         self.clients: Dict[str, Any] = {}
+        # Change counters used to invalidate data derived from the configuration
+        self._config_version = 0
+        self._client_versions: Dict[str, int] = {}
         self._load_config()
         self._load_clients()
     
@@ -75,6 +79,7 @@ class ConfigManager:
         try:
             for key, value in self.main.items():
                 set_config_value(key, value)
+            self._config_version += 1
             logger.debug(f"Saved configuration to database ({len(self.main)} keys)")
         except Exception as e:
             logger.error(f"Failed to save configuration: {e}")
@@ -83,8 +88,7 @@ class ConfigManager:
     def save_clients(self) -> None:
         """Save clients configuration to database"""
         try:
-            for username, client_data in self.clients.items():
-                save_client(username, client_data)
+            save_clients(self.clients)
             logger.debug(f"Saved {len(self.clients)} clients to database")
         except Exception as e:
             logger.error(f"Failed to save clients: {e}")
@@ -97,6 +101,7 @@ class ConfigManager:
     def set(self, key: str, value: Any, save: bool = True) -> None:
         """Set value in main config and optionally save"""
         self.main[key] = value
+        self._config_version += 1
         if save:
             self.save_config()
     
@@ -115,12 +120,25 @@ class ConfigManager:
     def set_client(self, username: str, client_data: Dict[str, Any], save: bool = True) -> None:
         """Set client configuration and optionally save"""
         self.clients[username] = client_data
+        self._bump_client_version(username)
         if save:
-            save_client(username, client_data)
-            # Reload only this client to ensure consistency (don't reload all to avoid race conditions)
-            updated_client = get_client(username)
-            if updated_client:
-                self.clients[username] = updated_client
+            # Cache the stored row, so response-only keys of client_data are dropped
+            self.clients[username] = save_client(username, client_data)
+    
+    def update_handshakes(self, handshakes: Dict[str, int]) -> None:
+        """
+        Save newer latest handshake times for multiple clients at once
+        
+        Handshake times do not affect generated configs, so client versions are not changed.
+        
+        Args:
+            handshakes: Mapping of username -> latest handshake (Unix time)
+        """
+        update_latest_handshakes(handshakes)
+        for username, handshake in handshakes.items():
+            client = self.clients.get(username)
+            if client is not None and handshake > (client.get("latest_handshake") or 0):
+                client["latest_handshake"] = handshake
     
     def delete_client(self, username: str, save: bool = True) -> None:
         """Delete client configuration and optionally save"""
@@ -128,8 +146,27 @@ class ConfigManager:
             delete_client(username)
         if username in self.clients:
             del self.clients[username]
+        self._bump_client_version(username)
     
     def has_client(self, username: str) -> bool:
-        """Check if client exists"""
-        return client_exists(username)
-
+        """Check if client exists (in-memory lookup)"""
+        return username in self.clients
+    
+    def get_version(self, username: str) -> Tuple[int, int]:
+        """
+        Get change counters for the main configuration and a client
+        
+        The returned tuple changes whenever the main configuration or the
+        given client is modified through this manager.
+        
+        Args:
+            username: Client username
+            
+        Returns:
+            Tuple of (config_version, client_version)
+        """
+        return self._config_version, self._client_versions.get(username, 0)
+    
+    def _bump_client_version(self, username: str) -> None:
+        """Mark client configuration as changed"""
+        self._client_versions[username] = self._client_versions.get(username, 0) + 1
@@ -19,6 +19,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import sqlite3
 import json
+import copy
 import os
 import logging
 import threading
@@ -33,61 +34,113 @@ logger = logging.getLogger(__name__)
 # SQLite database file path
 DB_FILE = "/config/wg-easy.db"
 
-# Thread-local storage for database connections (one per thread)
-_local = threading.local()
+# Single database connection shared by all threads, used under _db_lock
+_connection: Optional[sqlite3.Connection] = None
+_db_lock = threading.RLock()
+
+# Write-through cache of the config table, loaded on first access
+_config_cache: Optional[Dict[str, Any]] = None
+_config_cache_lock = threading.Lock()
 
 
 def get_db_connection() -> sqlite3.Connection:
-    """Get thread-local database connection"""
-    if not hasattr(_local, 'connection') or _local.connection is None:
-        _local.connection = sqlite3.connect(
-            DB_FILE,
-            check_same_thread=False,
-            timeout=30.0  # 30 second timeout for locks
-        )
-        _local.connection.row_factory = sqlite3.Row  # Return rows as dict-like objects
-        # Enable WAL mode for better concurrency
-        _local.connection.execute("PRAGMA journal_mode=WAL")
-        _local.connection.execute("PRAGMA foreign_keys=ON")
-    return _local.connection
+    """
+    Get the process-wide database connection
+    
+    The connection is shared between threads; use it through get_db(),
+    which serializes access with _db_lock.
+    """
+    global _connection
+    with _db_lock:
+        if _connection is None:
+            conn = sqlite3.connect(
+                DB_FILE,
+                check_same_thread=False,
+                timeout=30.0,  # 30 second timeout for locks
+                cached_statements=256,  # Keep prepared statements for all queries below
+                isolation_level=None  # Transactions are controlled explicitly in get_db()
+            )
+            conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+            # Enable WAL mode for better concurrency
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            # WAL makes synchronous=NORMAL safe against application crashes and
+            # avoids an fsync on every commit
+            for pragma in (
+                "PRAGMA synchronous=NORMAL",
+                "PRAGMA temp_store=MEMORY",
+                "PRAGMA cache_size=-20000",  # 20 MB
+                "PRAGMA mmap_size=268435456",  # 256 MB
+                "PRAGMA wal_autocheckpoint=1000",
+            ):
+                try:
+                    conn.execute(pragma)
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to apply '{pragma}': {e}")
+            _connection = conn
+        return _connection
 
 
 @contextmanager
-def get_db():
-    """Context manager for database operations with automatic commit/rollback"""
-    conn = get_db_connection()
-    try:
-        yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise
+def get_db(readonly: bool = False, write: bool = False):
+    """
+    Context manager for database operations with automatic commit/rollback
+    
+    Args:
+        readonly: Do not open a transaction (for statements that only read data)
+        write: Take the write lock when the transaction starts (BEGIN IMMEDIATE)
+            instead of upgrading to it on the first write
+    """
+    with _db_lock:
+        conn = get_db_connection()
+        if readonly or conn.in_transaction:
+            # Reads run in autocommit mode; nested blocks join the outer transaction
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
 
 
 def init_database() -> None:
     """Initialize database schema"""
     logger.info("Initializing database schema...")
     
-    with get_db() as conn:
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
         
+        # Tables created by older versions as rowid tables are rebuilt below
+        old_config = _rename_rowid_table(cursor, "config")
+        old_tokens = _rename_rowid_table(cursor, "tokens")
+        
         # Main configuration table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS config (
                 key TEXT PRIMARY KEY,
                 value TEXT NOT NULL,
                 updated_at TEXT NOT NULL
-            )
+            ) WITHOUT ROWID
         """)
+        if old_config:
+            _move_table_rows(cursor, old_config, "config", "key, value, updated_at")
+        _migrate_config_values(cursor)
         
         # Clients table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS clients (
                 username TEXT PRIMARY KEY,
                 ip INTEGER NOT NULL,
+                ip_full TEXT,  -- "<subnet>.<ip>", kept in sync with the subnet config value
                 private_key TEXT NOT NULL,
                 public_key TEXT NOT NULL,
                 allowed_ips TEXT NOT NULL,  -- JSON array
+                allowed_ips_csv TEXT,  -- Same list, comma-separated (faster to parse)
                 obfuscator_port INTEGER,
                 masking_type_override TEXT,
                 verbosity_level TEXT,
@@ -104,8 +157,11 @@ def init_database() -> None:
                 token TEXT PRIMARY KEY,
                 created_at TEXT NOT NULL,
                 expires_in INTEGER NOT NULL
-            )
+            ) WITHOUT ROWID
         """)
+        if old_tokens:
+            # Also drops the old table's indexes before they are recreated below
+            _move_table_rows(cursor, old_tokens, "tokens", "token, created_at, expires_in")
         
         # Create indexes
         cursor.execute("""
@@ -118,43 +174,162 @@ def init_database() -> None:
             ON clients(enabled)
         """)
         
-        conn.commit()
-        logger.info("Database schema initialized successfully")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_clients_latest_handshake 
+            ON clients(latest_handshake)
+        """)
+        
+        _migrate_allowed_ips_csv(cursor)
+        _migrate_ip_full(cursor)
+    
+    # Refresh query planner statistics for the long-lived connection
+    # (only analyzes tables whose statistics are missing or stale)
+    with get_db(readonly=True) as conn:
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to optimize database: {e}")
+    
+    logger.info("Database schema initialized successfully")
 
 
-def get_config_value(key: str, default: Any = None) -> Any:
-    """Get configuration value from database"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM config WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        
-        if row is None:
-            return default
+def _rename_rowid_table(cursor: sqlite3.Cursor, table: str) -> Optional[str]:
+    """
+    Rename a table that was created without WITHOUT ROWID
+    
+    Args:
+        cursor: Database cursor
+        table: Table name
         
-        value_str = row['value']
-        # Try to parse as JSON, fallback to string
+    Returns:
+        New name of the old table, or None if it does not need to be rebuilt
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    row = cursor.fetchone()
+    if row is None or "WITHOUT ROWID" in row['sql'].upper():
+        return None
+    old_table = f"{table}_rowid_old"
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+    return old_table
+
+
+def _move_table_rows(cursor: sqlite3.Cursor, old_table: str, table: str, columns: str) -> None:
+    """Copy rows from a renamed old table into its replacement and drop the old table"""
+    cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {old_table}")
+    copied = cursor.rowcount
+    cursor.execute(f"DROP TABLE {old_table}")
+    logger.info(f"Rebuilt table {table} as WITHOUT ROWID ({copied} rows)")
+
+
+def _migrate_config_values(cursor: sqlite3.Cursor) -> None:
+    """JSON-encode config values stored as plain strings by older versions"""
+    cursor.execute("SELECT key, value FROM config")
+    rows = []
+    for row in cursor.fetchall():
         try:
-            return json.loads(value_str)
-        except (json.JSONDecodeError, TypeError):
-            return value_str
+            json.loads(row['value'])
+        except json.JSONDecodeError:
+            rows.append((json.dumps(row['value']), row['key']))
+    if rows:
+        cursor.executemany("UPDATE config SET value = ? WHERE key = ?", rows)
+        logger.info(f"Migrated {len(rows)} config values to JSON format")
+
+
+def _migrate_allowed_ips_csv(cursor: sqlite3.Cursor) -> None:
+    """Add allowed_ips_csv column to older databases and fill it from allowed_ips JSON"""
+    cursor.execute("PRAGMA table_info(clients)")
+    columns = {row['name'] for row in cursor.fetchall()}
+    if "allowed_ips_csv" not in columns:
+        cursor.execute("ALTER TABLE clients ADD COLUMN allowed_ips_csv TEXT")
+    
+    cursor.execute("SELECT username, allowed_ips FROM clients WHERE allowed_ips_csv IS NULL")
+    rows = [
+        (",".join(json.loads(row['allowed_ips'])), row['username'])
+        for row in cursor.fetchall()
+    ]
+    if rows:
+        cursor.executemany("UPDATE clients SET allowed_ips_csv = ? WHERE username = ?", rows)
+        logger.info(f"Migrated allowed_ips of {len(rows)} clients to comma-separated format")
+
+
+def _migrate_ip_full(cursor: sqlite3.Cursor) -> None:
+    """Add ip_full column to older databases and fill it from the subnet config value"""
+    cursor.execute("PRAGMA table_info(clients)")
+    columns = {row['name'] for row in cursor.fetchall()}
+    if "ip_full" not in columns:
+        cursor.execute("ALTER TABLE clients ADD COLUMN ip_full TEXT")
+    
+    cursor.execute("SELECT value FROM config WHERE key = ?", ("subnet",))
+    row = cursor.fetchone()
+    subnet = json.loads(row['value']) if row else None
+    cursor.execute(
+        "UPDATE clients SET ip_full = ? || '.' || ip WHERE ip_full IS NULL",
+        (str(subnet),)
+    )
+
+
+def _parse_allowed_ips(allowed_ips_csv: Optional[str], allowed_ips_json: str) -> List[str]:
+    """Get allowed IPs list from stored columns"""
+    if allowed_ips_csv is None:
+        return json.loads(allowed_ips_json)
+    if not allowed_ips_csv:
+        return []
+    return allowed_ips_csv.split(",")
+
+
+def _copy_config_value(value: Any) -> Any:
+    """Copy mutable config values so callers cannot modify the cache"""
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _get_config_cache() -> Dict[str, Any]:
+    """Get cached configuration, loading it from database on first use"""
+    global _config_cache
+    with _config_cache_lock:
+        if _config_cache is None:
+            with get_db(readonly=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT key, value FROM config")
+                _config_cache = {
+                    row['key']: json.loads(row['value'])
+                    for row in cursor
+                }
+        return _config_cache
+
+
+def get_config_value(key: str, default: Any = None) -> Any:
+    """Get configuration value (served from the in-memory cache)"""
+    config = _get_config_cache()
+    if key not in config:
+        return default
+    return _copy_config_value(config[key])
 
 
 def set_config_value(key: str, value: Any) -> None:
-    """Set configuration value in database"""
-    # Convert value to JSON string if it's not a string
-    if not isinstance(value, str):
-        value_str = json.dumps(value)
-    else:
-        value_str = value
+    """Set configuration value in database and cache"""
+    # All values (including strings) are stored JSON-encoded
+    value_str = json.dumps(value)
     
-    with get_db() as conn:
-        cursor = conn.cursor()
-        now = datetime.now().isoformat()
-        cursor.execute("""
-            INSERT OR REPLACE INTO config (key, value, updated_at)
-            VALUES (?, ?, ?)
-        """, (key, value_str, now))
+    # Cache the value exactly as it will be read back from database
+    decoded_value = json.loads(value_str)
+    
+    config = _get_config_cache()
+    with _config_cache_lock:
+        with get_db(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO config (key, value, updated_at)
+                VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+            """, (key, value_str))
+            if key == "subnet" and config.get("subnet") != decoded_value:
+                # Client addresses are stored with the subnet prefix
+                cursor.execute(
+                    "UPDATE clients SET ip_full = ? || '.' || ip",
+                    (str(decoded_value),)
+                )
+        config[key] = decoded_value
 
 
 def get_metrics_token() -> Optional[str]:
@@ -176,213 +351,191 @@ def set_metrics_token(token: str) -> None:
 
 def delete_metrics_token() -> None:
     """Delete metrics token from database"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM config WHERE key = ?", ("metrics_token",))
-        cursor.execute("DELETE FROM config WHERE key = ?", ("grafana_token",))
+    config = _get_config_cache()
+    with _config_cache_lock:
+        with get_db(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM config WHERE key IN (?, ?)",
+                ("metrics_token", "grafana_token")
+            )
+        config.pop("metrics_token", None)
+        config.pop("grafana_token", None)
 
 
 def get_all_config() -> Dict[str, Any]:
     """Get all configuration as dictionary"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT key, value FROM config")
-        rows = cursor.fetchall()
-        
-        config = {}
-        for row in rows:
-            key = row['key']
-            value_str = row['value']
-            # Try to parse as JSON, fallback to string
-            try:
-                config[key] = json.loads(value_str)
-            except (json.JSONDecodeError, TypeError):
-                config[key] = value_str
-        
-        return config
+    config = _get_config_cache()
+    with _config_cache_lock:
+        return {key: _copy_config_value(value) for key, value in config.items()}
+
+
+# Columns selected for full client records, in the order unpacked by _client_from_row()
+_CLIENT_COLUMNS = """
+    username, ip, ip_full, private_key, public_key, allowed_ips, allowed_ips_csv,
+    obfuscator_port, masking_type_override, verbosity_level, enabled,
+    latest_handshake, created_at, updated_at
+"""
+
+
+def _client_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Build client dictionary from a row selected with _CLIENT_COLUMNS"""
+    (username, ip, ip_full, private_key, public_key, allowed_ips, allowed_ips_csv,
+     obfuscator_port, masking_type_override, verbosity_level, enabled,
+     latest_handshake, created_at, updated_at) = row
+    return {
+        'username': username,
+        'ip': ip,
+        'ip_full': ip_full,
+        'private_key': private_key,
+        'public_key': public_key,
+        'allowed_ips': _parse_allowed_ips(allowed_ips_csv, allowed_ips),
+        'obfuscator_port': obfuscator_port,
+        'masking_type_override': masking_type_override,
+        'verbosity_level': verbosity_level,
+        'enabled': bool(enabled),
+        'latest_handshake': latest_handshake or 0,
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
 
 
 def get_client(username: str) -> Optional[Dict[str, Any]]:
     """Get client by username"""
-    with get_db() as conn:
+    with get_db(readonly=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM clients WHERE username = ?
-        """, (username,))
+        cursor.execute(
+            "SELECT" + _CLIENT_COLUMNS + "FROM clients WHERE username = ?",
+            (username,)
+        )
         row = cursor.fetchone()
         
         if row is None:
             return None
         
-        client = dict(row)
-        # Parse JSON fields
-        client['ip_full'] = f"{get_config_value("subnet")}.{client['ip']}"
-        client['allowed_ips'] = json.loads(client['allowed_ips'])
-        client['enabled'] = bool(client['enabled'])
-        # latest_handshake is already an integer from DB
-        if 'latest_handshake' not in client:
-            client['latest_handshake'] = 0
-        return client
+        return _client_from_row(row)
 
 
 def get_all_clients() -> Dict[str, Dict[str, Any]]:
     """Get all clients as dictionary"""
-    with get_db() as conn:
+    with get_db(readonly=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM clients")
-        rows = cursor.fetchall()
+        cursor.execute("SELECT" + _CLIENT_COLUMNS + "FROM clients")
         
         clients = {}
-        subnet = get_config_value("subnet")
-        for row in rows:
-            username = row['username']
-            client = dict(row)
-            # Parse JSON fields
-            client['ip_full'] = f"{subnet}.{client['ip']}"
-            client['allowed_ips'] = json.loads(client['allowed_ips'])
-            client['enabled'] = bool(client['enabled'])
-            # latest_handshake is already an integer from DB
-            if 'latest_handshake' not in client:
-                client['latest_handshake'] = 0
-            clients[username] = client
+        for row in cursor:
+            client = _client_from_row(row)
+            clients[client['username']] = client
         
         return clients
 
 
-def save_client(username: str, client_data: Dict[str, Any]) -> None:
-    """Save or update client"""
-    allowed_ips_json = json.dumps(client_data.get("allowed_ips", ["0.0.0.0/0"]))
-    now = datetime.now().isoformat()
+# Insert a client or update it in place, keeping created_at and the newest latest_handshake
+_UPSERT_CLIENT_SQL = """
+    INSERT INTO clients (
+        username, ip, ip_full, private_key, public_key, allowed_ips, allowed_ips_csv,
+        obfuscator_port, masking_type_override, verbosity_level,
+        enabled, latest_handshake, created_at, updated_at
+    ) VALUES (
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'),
+        strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')
+    )
+    ON CONFLICT(username) DO UPDATE SET
+        ip = excluded.ip,
+        ip_full = excluded.ip_full,
+        private_key = excluded.private_key,
+        public_key = excluded.public_key,
+        allowed_ips = excluded.allowed_ips,
+        allowed_ips_csv = excluded.allowed_ips_csv,
+        obfuscator_port = excluded.obfuscator_port,
+        masking_type_override = excluded.masking_type_override,
+        verbosity_level = excluded.verbosity_level,
+        enabled = excluded.enabled,
+        latest_handshake = MAX(excluded.latest_handshake, COALESCE(clients.latest_handshake, 0)),
+        updated_at = excluded.updated_at
+"""
+
+
+def _client_params(username: str, client_data: Dict[str, Any], subnet: Any) -> tuple:
+    """Build parameters for _UPSERT_CLIENT_SQL from client data"""
+    allowed_ips = client_data.get("allowed_ips", ["0.0.0.0/0"])
+    return (
+        username,
+        client_data.get("ip"),
+        f"{subnet}.{client_data.get('ip')}",
+        client_data.get("private_key"),
+        client_data.get("public_key"),
+        json.dumps(allowed_ips),
+        ",".join(allowed_ips),
+        client_data.get("obfuscator_port"),
+        client_data.get("masking_type_override"),
+        client_data.get("verbosity_level"),
+        1 if client_data.get("enabled", True) else 0,
+        client_data.get("latest_handshake") or 0
+    )
+
+
+def save_client(username: str, client_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Save or update client
     
-    with get_db() as conn:
+    Returns:
+        Client dictionary as stored in database (same format as get_client())
+    """
+    subnet = get_config_value("subnet")
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
-        
-        # Check if client exists
-        cursor.execute("SELECT username FROM clients WHERE username = ?", (username,))
-        exists = cursor.fetchone() is not None
-        
-        if exists:
-            # Update existing client
-            # Only update latest_handshake if it's provided and is newer than current
-            latest_handshake = client_data.get("latest_handshake")
-            if latest_handshake is not None:
-                # Get current latest_handshake to compare
-                cursor.execute("SELECT latest_handshake FROM clients WHERE username = ?", (username,))
-                current_row = cursor.fetchone()
-                current_handshake = current_row['latest_handshake'] if current_row else 0
-                # Only update if new value is greater (newer)
-                if latest_handshake > current_handshake:
-                    cursor.execute("""
-                        UPDATE clients SET
-                            ip = ?, private_key = ?, public_key = ?,
-                            allowed_ips = ?, obfuscator_port = ?,
-                            masking_type_override = ?, verbosity_level = ?,
-                            enabled = ?, latest_handshake = ?, updated_at = ?
-                        WHERE username = ?
-                    """, (
-                        client_data.get("ip"),
-                        client_data.get("private_key"),
-                        client_data.get("public_key"),
-                        allowed_ips_json,
-                        client_data.get("obfuscator_port"),
-                        client_data.get("masking_type_override"),
-                        client_data.get("verbosity_level"),
-                        1 if client_data.get("enabled", True) else 0,
-                        latest_handshake,
-                        now,
-                        username
-                    ))
-                else:
-                    # Don't update latest_handshake, use existing SQL
-                    cursor.execute("""
-                        UPDATE clients SET
-                            ip = ?, private_key = ?, public_key = ?,
-                            allowed_ips = ?, obfuscator_port = ?,
-                            masking_type_override = ?, verbosity_level = ?,
-                            enabled = ?, updated_at = ?
-                        WHERE username = ?
-                    """, (
-                        client_data.get("ip"),
-                        client_data.get("private_key"),
-                        client_data.get("public_key"),
-                        allowed_ips_json,
-                        client_data.get("obfuscator_port"),
-                        client_data.get("masking_type_override"),
-                        client_data.get("verbosity_level"),
-                        1 if client_data.get("enabled", True) else 0,
-                        now,
-                        username
-                    ))
-            else:
-                # No latest_handshake provided in client_data, preserve existing value in DB
-                # Get current latest_handshake from DB to preserve it
-                cursor.execute("SELECT latest_handshake FROM clients WHERE username = ?", (username,))
-                current_row = cursor.fetchone()
-                existing_handshake = current_row['latest_handshake'] if current_row else 0
-                
-                cursor.execute("""
-                    UPDATE clients SET
-                        ip = ?, private_key = ?, public_key = ?,
-                        allowed_ips = ?, obfuscator_port = ?,
-                        masking_type_override = ?, verbosity_level = ?,
-                        enabled = ?, latest_handshake = ?, updated_at = ?
-                    WHERE username = ?
-                """, (
-                    client_data.get("ip"),
-                    client_data.get("private_key"),
-                    client_data.get("public_key"),
-                    allowed_ips_json,
-                    client_data.get("obfuscator_port"),
-                    client_data.get("masking_type_override"),
-                    client_data.get("verbosity_level"),
-                    1 if client_data.get("enabled", True) else 0,
-                    existing_handshake,  # Preserve existing latest_handshake
-                    now,
-                    username
-                ))
-        else:
-            # Insert new client
-            latest_handshake = client_data.get("latest_handshake", 0)
-            cursor.execute("""
-                INSERT INTO clients (
-                    username, ip, private_key, public_key, allowed_ips,
-                    obfuscator_port, masking_type_override, verbosity_level,
-                    enabled, latest_handshake, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                username,
-                client_data.get("ip"),
-                client_data.get("private_key"),
-                client_data.get("public_key"),
-                allowed_ips_json,
-                client_data.get("obfuscator_port"),
-                client_data.get("masking_type_override"),
-                client_data.get("verbosity_level"),
-                1 if client_data.get("enabled", True) else 0,
-                latest_handshake,
-                now,
-                now
-            ))
+        # RETURNING hands back the stored row without a separate SELECT
+        cursor.execute(
+            _UPSERT_CLIENT_SQL + "RETURNING" + _CLIENT_COLUMNS,
+            _client_params(username, client_data, subnet)
+        )
+        return _client_from_row(cursor.fetchone())
 
 
-def delete_client(username: str) -> None:
-    """Delete client"""
-    with get_db() as conn:
+def save_clients(clients: Dict[str, Dict[str, Any]]) -> None:
+    """Save or update multiple clients in a single transaction"""
+    if not clients:
+        return
+    subnet = get_config_value("subnet")
+    
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM clients WHERE username = ?", (username,))
+        cursor.executemany(
+            _UPSERT_CLIENT_SQL,
+            [_client_params(username, client_data, subnet) for username, client_data in clients.items()]
+        )
+
+
+def update_latest_handshakes(handshakes: Dict[str, int]) -> None:
+    """
+    Store newer latest handshake times for multiple clients in a single transaction
+    
+    Args:
+        handshakes: Mapping of username -> latest handshake (Unix time);
+            stored values that are already newer are kept
+    """
+    if not handshakes:
+        return
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "UPDATE clients SET latest_handshake = MAX(COALESCE(latest_handshake, 0), ?) WHERE username = ?",
+            [(handshake, username) for username, handshake in handshakes.items()]
+        )
 
 
-def client_exists(username: str) -> bool:
-    """Check if client exists"""
-    with get_db() as conn:
+def delete_client(username: str) -> None:
+    """Delete client"""
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM clients WHERE username = ?", (username,))
-        return cursor.fetchone() is not None
+        cursor.execute("DELETE FROM clients WHERE username = ?", (username,))
 
 
 def create_token(token: str, created_at: datetime, expires_in: int) -> None:
     """Create token in database"""
-    with get_db() as conn:
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO tokens (token, created_at, expires_in)
@@ -392,7 +545,7 @@ def create_token(token: str, created_at: datetime, expires_in: int) -> None:
 
 def get_token(token: str) -> Optional[Dict[str, Any]]:
     """Get token from database"""
-    with get_db() as conn:
+    with get_db(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT * FROM tokens WHERE token = ?
@@ -409,27 +562,26 @@ def get_token(token: str) -> Optional[Dict[str, Any]]:
 
 def delete_token(token: str) -> None:
     """Delete token from database"""
-    with get_db() as conn:
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM tokens WHERE token = ?", (token,))
 
 
 def delete_all_tokens() -> None:
     """Delete all tokens from database"""
-    with get_db() as conn:
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM tokens")
 
 
 def get_all_tokens() -> Dict[str, Dict[str, Any]]:
     """Get all tokens from database"""
-    with get_db() as conn:
+    with get_db(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM tokens")
-        rows = cursor.fetchall()
         
         tokens = {}
-        for row in rows:
+        for row in cursor:
             token = row['token']
             token_data = dict(row)
             token_data['created_at'] = datetime.fromisoformat(token_data['created_at'])
@@ -445,22 +597,11 @@ def cleanup_expired_tokens() -> int:
     Returns:
         Number of deleted tokens
     """
-    with get_db() as conn:
+    with get_db(write=True) as conn:
         cursor = conn.cursor()
-        now = datetime.now()
-        
-        cursor.execute("SELECT token, created_at, expires_in FROM tokens")
-        rows = cursor.fetchall()
-        
-        deleted_count = 0
-        for row in rows:
-            created_at = datetime.fromisoformat(row['created_at'])
-            expires_in = row['expires_in']
-            elapsed = (now - created_at).total_seconds()
-            
-            if elapsed > expires_in:
-                cursor.execute("DELETE FROM tokens WHERE token = ?", (row['token'],))
-                deleted_count += 1
-        
-        return deleted_count
-
+        # created_at is stored as local ISO time, so compare against local "now"
+        cursor.execute("""
+            DELETE FROM tokens
+            WHERE (julianday(?) - julianday(created_at)) * 86400 > expires_in
+        """, (datetime.now().isoformat(),))
+        return cursor.rowcount
@@ -21,6 +21,8 @@ import os
 import signal
 import atexit
 import logging
+import re
+import threading
 
 from .config import ConfigManager
 from .config.constants import API_PORT
@@ -28,7 +30,6 @@ from .auth import TokenManager
 from .wireguard import WireGuardManager
 from .obfuscator import ObfuscatorManager, ObfuscatorLogs
 from .clients import ClientManager
-from .api import create_app
 from .services import ServiceManager
 from .utils import get_external_ip, get_external_port, initialize_config, check_and_set_system_timezone
 from .exceptions import ServiceError
@@ -42,6 +43,7 @@ log_level = getattr(logging, log_level_str, logging.INFO)
 logging.basicConfig(
     level=log_level,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',  # Skip the millisecond suffix of the default format
     handlers=[
         logging.StreamHandler()  # Only log to stdout/stderr for Docker
     ]
@@ -55,14 +57,30 @@ else:
 
 logger = logging.getLogger(__name__)
 
-# Flag to prevent multiple cleanup calls
-_cleanup_called = False
+
+# Werkzeug startup banner lines (the warning may be wrapped in ANSI color codes)
+_WERKZEUG_BANNER_RE = re.compile(r'This is a development server|^\s*\* ')
+
+
+class _WerkzeugBannerFilter(logging.Filter):
+    """Drop Werkzeug development server startup banner records"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return _WERKZEUG_BANNER_RE.search(record.getMessage()) is None
+
+
+# Set once cleanup has started, to prevent multiple cleanup calls
+_cleanup_started = False
+_cleanup_lock = threading.Lock()
+
+
 def cleanup_on_exit(wg_manager, obfuscator_manager):
     """Cleanup function called on application exit"""
-    global _cleanup_called
-    if _cleanup_called:
-        return
-    _cleanup_called = True
+    global _cleanup_started
+    with _cleanup_lock:
+        if _cleanup_started:
+            return
+        _cleanup_started = True
     
     logger.info("Shutting down...")
     try:
@@ -121,11 +139,13 @@ def main():
     
     # Handle SIGINT (Ctrl+C) and SIGTERM
     def signal_handler(signum, frame):
+        # Ignore repeated signals (e.g. double Ctrl+C) while shutting down
+        signal.signal(signum, signal.SIG_IGN)
         cleanup()
         exit(0)
     
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal_handler)
     
     # Generate configs and start services
     try:
@@ -140,7 +160,8 @@ def main():
         service_manager.generate_configs()
         # Only start services if WireGuard is enabled
         if config.get('enabled', True):
-            service_manager.restart_services()
+            # Always restart on startup to take over processes left from a previous run
+            service_manager.restart_services(force=True)
             logger.info("Services started successfully")
         else:
             logger.info("WireGuard is disabled, services not started")
@@ -148,7 +169,8 @@ def main():
         logger.warning(f"Failed to start services on startup: {e}")
         logger.info("Application will continue, but services may not be running")
     
-    # Create Flask application
+    # Create Flask application (imported here so Flask loads only once startup succeeded)
+    from .api import create_app
     app = create_app(
         config_manager,
         client_manager,
@@ -163,39 +185,14 @@ def main():
     use_reloader = os.getenv("USE_RELOADER", "false").lower() == "true"
     debug = os.getenv("FLASK_DEBUG", "false").lower() == "true"
     
-    # Start Flask server
+    # Start HTTP server
     try:
-        logger.info(f"Starting Flask server on 0.0.0.0:{API_PORT} (HTTP)")
-        # Suppress Werkzeug and Flask startup messages
-        import sys
-        
-        # Redirect stdout/stderr temporarily to suppress Flask startup messages
-        original_stdout = sys.stdout
-        original_stderr = sys.stderr
-        
-        # Create a filter that only allows our logger messages
-        class LogFilter:
-            def __init__(self, original):
-                self.original = original
-                self.allow_patterns = []
-            
-            def write(self, text):
-                # Block Werkzeug/Flask startup messages
-                if any(x in text for x in ['Running on', 'WARNING: This is a development server', '* ']):
-                    return
-                # Allow everything else (errors, etc.)
-                self.original.write(text)
-            
-            def flush(self):
-                self.original.flush()
-        
-        # Only filter if not in debug mode (to allow debugging)
-        if not debug:
-            sys.stdout = LogFilter(original_stdout)
-            sys.stderr = LogFilter(original_stderr)
-        
-        try:
-            # For production, use threaded mode for concurrent request handling
+        if debug or use_reloader:
+            # Werkzeug development server (interactive debugger, auto-reload)
+            logger.info(f"Starting Flask development server on 0.0.0.0:{API_PORT} (HTTP)")
+            # Keep the startup banner only when debugging
+            if not debug:
+                logging.getLogger('werkzeug').addFilter(_WerkzeugBannerFilter())
             threaded = os.getenv("FLASK_THREADED", "true").lower() == "true"
             app.run(
                 host='0.0.0.0', 
@@ -204,10 +201,20 @@ def main():
                 use_reloader=use_reloader, 
                 threaded=threaded
             )
-        finally:
-            # Restore original stdout/stderr
-            sys.stdout = original_stdout
-            sys.stderr = original_stderr
+        else:
+            # Production WSGI server with a fixed worker thread pool
+            from waitress import serve
+            
+            threads = int(os.getenv("WAITRESS_THREADS", "16"))
+            logger.info(f"Starting server on 0.0.0.0:{API_PORT} (HTTP, {threads} threads)")
+            serve(
+                app,
+                host='0.0.0.0',
+                port=API_PORT,
+                threads=threads,
+                connection_limit=1000,
+                channel_timeout=60
+            )
     except Exception as e:
         logger.error(f"Flask server error: {e}")
         return 1
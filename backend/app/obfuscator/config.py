@@ -17,6 +17,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """Obfuscator configuration file generation"""
 
+import os
 import logging
 from typing import Dict, Optional
 
@@ -120,14 +121,32 @@ class ObfuscatorConfigGenerator:
         return config_content
     
     @staticmethod
-    def save_config_file(config_content: str) -> None:
+    def save_config_file(config_content: str) -> bool:
         """
         Save obfuscator configuration to file
         
         Args:
             config_content: Configuration file content
+            
+        Returns:
+            True if the file content changed, False if it was already up to date
         """
-        with open(WG_OBFUSCATOR_CONFIG_FILE, "w") as f:
+        try:
+            with open(WG_OBFUSCATOR_CONFIG_FILE, "r") as f:
+                if f.read() == config_content:
+                    logger.debug(f"Obfuscator config {WG_OBFUSCATOR_CONFIG_FILE} is up to date")
+                    return False
+        except OSError:
+            pass  # No config file yet
+        
+        # Write to a temporary file and rename it over the old one, so the
+        # obfuscator never sees a partially written config
+        tmp_path = f"{WG_OBFUSCATOR_CONFIG_FILE}.tmp"
+        with open(tmp_path, "w") as f:
             f.write(config_content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, WG_OBFUSCATOR_CONFIG_FILE)
         logger.debug(f"Saved obfuscator config to {WG_OBFUSCATOR_CONFIG_FILE}")
+        return True
 
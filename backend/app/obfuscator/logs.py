@@ -17,23 +17,46 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """In-memory log storage for obfuscator"""
 
-import threading
+import time
 from collections import deque
-from datetime import datetime
-from typing import List
+from itertools import islice
+from typing import List, Optional
 
 import logging
 
+from ..config.constants import OBFUSCATOR_LOG_MAX_LINES
+
 logger = logging.getLogger(__name__)
 
+# Tag of fatal error messages in obfuscator output
+ERROR_TAG = "[main][E]"
+
 
 class ObfuscatorLogs:
-    """Thread-safe in-memory log storage for obfuscator output"""
+    """
+    Thread-safe in-memory log storage for obfuscator output
+    
+    No lock is taken: deque.append(), extend(), len() and clear() are atomic,
+    and snapshots are copied in C without releasing the GIL.
+    """
     
-    def __init__(self, max_size: int = 10000):
+    def __init__(self, max_size: int = OBFUSCATOR_LOG_MAX_LINES):
         self.logs: deque = deque(maxlen=max_size)
-        self.lock = threading.Lock()
         self.max_size = max_size
+        # Formatted timestamp of the last second a line was logged in
+        self._ts_cache_sec = -1
+        self._ts_cache_str = ''
+        # Message of the most recent "[main][E]" line, tracked as lines are added
+        self._last_error: Optional[str] = None
+    
+    def _timestamp(self) -> str:
+        """Get current timestamp string, formatting it at most once per second"""
+        now = time.time()
+        sec = int(now)
+        if sec != self._ts_cache_sec:
+            self._ts_cache_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+            self._ts_cache_sec = sec
+        return self._ts_cache_str
     
     def add_log(self, line: str, add_timestamp: bool = True) -> None:
         """
@@ -43,15 +66,37 @@ class ObfuscatorLogs:
             line: Log line to add
             add_timestamp: Whether to add timestamp prefix
         """
-        with self.lock:
-            if add_timestamp:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                log_entry = f"[{timestamp}] {line.rstrip()}"
-            else:
-                log_entry = line.rstrip()
-            
-            self.logs.append(log_entry)
-            logger.debug(f"Added log entry (total: {len(self.logs)})")
+        if add_timestamp:
+            log_entry = f"[{self._timestamp()}] {line.rstrip()}"
+        else:
+            log_entry = line.rstrip()
+        
+        self.logs.append(log_entry)
+        if ERROR_TAG in log_entry:
+            self._last_error = log_entry.rpartition(ERROR_TAG)[2].strip()
+        logger.debug("Added log entry (total: %d)", len(self.logs))
+    
+    def add_logs(self, lines: List[str], add_timestamp: bool = True) -> None:
+        """
+        Add multiple log lines to storage at once
+        
+        Args:
+            lines: Log lines to add
+            add_timestamp: Whether to add timestamp prefix (shared by all lines)
+        """
+        if not lines:
+            return
+        
+        if add_timestamp:
+            prefix = f"[{self._timestamp()}] "
+            self.logs.extend([prefix + line.rstrip() for line in lines])
+        else:
+            self.logs.extend([line.rstrip() for line in lines])
+        for line in reversed(lines):
+            if ERROR_TAG in line:
+                self._last_error = line.rpartition(ERROR_TAG)[2].strip()
+                break
+        logger.debug("Added %d log entries (total: %d)", len(lines), len(self.logs))
     
     def get_logs(self, n_lines: int = 100) -> List[str]:
         """
@@ -63,24 +108,39 @@ class ObfuscatorLogs:
         Returns:
             List of log lines
         """
-        with self.lock:
-            total_lines = len(self.logs)
-            if total_lines == 0:
-                return []
-            
-            if total_lines > n_lines:
-                return list(self.logs)[-n_lines:]
-            else:
-                return list(self.logs)
+        total_lines = len(self.logs)
+        if total_lines == 0:
+            return []
+        
+        if total_lines > n_lines:
+            # Walk only the tail (from the right end) instead of copying the whole deque
+            tail = list(islice(reversed(self.logs), n_lines))
+            tail.reverse()
+            return tail
+        else:
+            return list(self.logs)
+    
+    def get_last_error(self) -> Optional[str]:
+        """
+        Get the most recent error message from obfuscator output
+        
+        Returns:
+            Text following the last "[main][E]" tag, or None if there was none
+            since the logs were last cleared
+        """
+        return self._last_error
+    
+    def clear_last_error(self) -> None:
+        """Forget the most recent error message"""
+        self._last_error = None
     
     def clear(self) -> None:
         """Clear all logs"""
-        with self.lock:
-            self.logs.clear()
-            logger.info("Cleared obfuscator logs")
+        self.logs.clear()
+        self._last_error = None
+        logger.info("Cleared obfuscator logs")
     
     def __len__(self) -> int:
         """Get total number of log lines"""
-        with self.lock:
-            return len(self.logs)
+        return len(self.logs)
 
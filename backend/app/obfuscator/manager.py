@@ -17,13 +17,17 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """Obfuscator process management"""
 
+import os
+import signal
 import subprocess
 import time
 import threading
 import logging
 import re
+import select
+import shutil
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator, List, Tuple
 
 from ..config.constants import WG_OBFUSCATOR_CONFIG_FILE
 from ..exceptions import ServiceError
@@ -31,6 +35,23 @@ from .logs import ObfuscatorLogs
 
 logger = logging.getLogger(__name__)
 
+# Process name as shown in /proc/<pid>/stat
+OBFUSCATOR_PROCESS_NAME = "wg-obfuscator"
+
+# Absolute path of the wg-obfuscator binary, resolved once instead of on every spawn
+WG_OBFUSCATOR_BIN = shutil.which("wg-obfuscator") or "/usr/bin/wg-obfuscator"
+
+# How long a process scan result is reused (seconds)
+PROCESS_CHECK_TTL = 0.05
+
+# First line of "wg-obfuscator --help" output
+_VERSION_RE = re.compile(r'Starting WireGuard Obfuscator (.*)')
+# Nightly build version: "(commit <hash> @ <repo URL>) (<arch>)"
+_NIGHTLY_VERSION_RE = re.compile(r'\((.*)@.*?\)(.*)')
+
+# Maximum number of bytes taken from the obfuscator output pipe per read
+LOG_READ_CHUNK_SIZE = 65536
+
 
 class ObfuscatorManager:
     """Manages wg-obfuscator process"""
@@ -40,11 +61,15 @@ class ObfuscatorManager:
         self.log_storage = log_storage or ObfuscatorLogs()
         self._log_thread: Optional[threading.Thread] = None
         self._cached_version: Optional[str] = None  # Cache version for container lifetime
+        # (monotonic timestamp, result) of the last process scan
+        self._proc_check_cache: Tuple[float, bool] = (0.0, False)
+        # Probe the version in the background so status requests never wait for it
+        threading.Thread(target=self._probe_version, daemon=True).start()
     
     def stop(self) -> None:
         """Stop wg-obfuscator process if running"""
         # Clean up zombie processes first
-        self._cleanup_zombie_processes()
+        running_pids = self._cleanup_zombie_processes()
         
         # Check if our tracked process is still running
         if self.process is not None:
@@ -55,30 +80,26 @@ class ObfuscatorManager:
                 return
         
         # Check if there are any running (non-zombie) wg-obfuscator processes
-        if not self._is_process_running():
+        if not running_pids:
             # No running processes found
             self.process = None
             return
         
         try:
-            # Find and kill wg-obfuscator processes (only non-zombie ones)
-            subprocess.run(
-                ["pkill", "-f", "wg-obfuscator"],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                check=False,
-                timeout=5
-            )
+            if self.process is not None:
+                # Our own child: the wait returns as soon as it exits
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    logger.warning("Obfuscator process did not terminate within expected time, killing it")
+                    self.process.kill()
+                    self.process.wait(timeout=1)
+                self.invalidate_proc_cache()
             
-            # Wait for process to terminate, with retries
-            max_attempts = 10
-            for attempt in range(max_attempts):
-                time.sleep(0.2)  # Wait 200ms between checks
-                if not self._is_process_running():
-                    # Process has terminated (or only zombies remain)
-                    break
-            else:
-                # Process still running after max attempts
+            # Terminate processes we do not track (e.g. left over from a previous instance)
+            untracked_pids = self._cleanup_zombie_processes()
+            if untracked_pids and not self._terminate_untracked(untracked_pids, timeout=2):
                 logger.warning("Obfuscator process did not terminate within expected time")
             
             # Clean up zombies again after kill
@@ -98,29 +119,17 @@ class ObfuscatorManager:
             ServiceError: If obfuscator fails to start
         """
         # Clean up zombie processes first
-        self._cleanup_zombie_processes()
+        running_pids = self._cleanup_zombie_processes()
         
         # Check if process is already running
-        if self._is_process_running():
+        if running_pids:
             # Process is running but may not be tracked - we need to restart it
             # to capture logs properly
             if self.process is None or self.process.poll() is not None:
                 logger.warning("Obfuscator is running but not tracked - restarting to capture logs")
                 # Stop the untracked process
                 try:
-                    subprocess.run(
-                        ["pkill", "-f", "wg-obfuscator"],
-                        stderr=subprocess.DEVNULL,
-                        stdout=subprocess.DEVNULL,
-                        check=False,
-                        timeout=5
-                    )
-                    # Wait a bit for process to terminate
-                    max_attempts = 10
-                    for attempt in range(max_attempts):
-                        time.sleep(0.2)
-                        if not self._is_process_running():
-                            break
+                    self._terminate_untracked(running_pids, timeout=1)
                     self._cleanup_zombie_processes()
                 except Exception as e:
                     logger.warning(f"Failed to stop untracked process: {e}")
@@ -130,14 +139,16 @@ class ObfuscatorManager:
                 return
         
         try:
+            # Errors of the previous run no longer apply
+            self.log_storage.clear_last_error()
+            
             # Start process with PIPE to capture output
             process = subprocess.Popen(
-                ["wg-obfuscator", "-c", WG_OBFUSCATOR_CONFIG_FILE],
+                [WG_OBFUSCATOR_BIN, "-c", WG_OBFUSCATOR_CONFIG_FILE],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 start_new_session=True,  # Detach from parent process
-                universal_newlines=True,
-                bufsize=1  # Line buffered
+                bufsize=0  # Raw pipe, the reader thread splits lines itself
             )
             
             # Start thread to read logs with timestamps
@@ -150,17 +161,82 @@ class ObfuscatorManager:
             
             self.process = process
             self._log_thread = log_thread
+            self.invalidate_proc_cache()
             logger.info("Started obfuscator")
         except Exception as e:
             logger.error(f"Failed to start obfuscator: {e}")
             raise ServiceError(f"Failed to start wg-obfuscator: {str(e)}")
     
+    def _terminate_untracked(self, pids: List[int], timeout: float = 2.0) -> bool:
+        """
+        Send SIGTERM to processes we did not start and wait for them to exit
+        
+        Args:
+            pids: Process IDs to terminate
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if all processes exited, False on timeout
+        """
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass  # Already exited
+        return self._wait_for_exit(pids, timeout)
+    
+    def _wait_for_exit(self, pids: List[int], timeout: float) -> bool:
+        """
+        Wait for processes to exit
+        
+        Uses pidfds, which become readable as soon as the process exits whether
+        or not it is our child. Falls back to polling /proc if they are not supported.
+        
+        Args:
+            pids: Process IDs to wait for
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if all processes exited, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        pidfds: List[int] = []
+        try:
+            try:
+                for pid in pids:
+                    try:
+                        pidfds.append(os.pidfd_open(pid))
+                    except ProcessLookupError:
+                        pass  # Already exited
+            except (AttributeError, OSError):
+                # pidfd_open() is not available (Linux < 5.3), poll instead
+                while self._is_process_running():
+                    if time.monotonic() >= deadline:
+                        return False
+                    time.sleep(PROCESS_CHECK_TTL)
+                return True
+            
+            poller = select.poll()
+            for fd in pidfds:
+                poller.register(fd, select.POLLIN)
+            remaining = len(pidfds)
+            while remaining:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    return False
+                for fd, _ in poller.poll(wait * 1000):
+                    poller.unregister(fd)
+                    remaining -= 1
+            return True
+        finally:
+            for fd in pidfds:
+                os.close(fd)
+            self.invalidate_proc_cache()
+    
     def restart(self) -> None:
         """Restart wg-obfuscator"""
         logger.info("Restarting obfuscator")
         self.stop()
-        # Additional wait after stop to ensure process fully terminated
-        time.sleep(0.3)
         # Clear logs on restart (optional)
         self.log_storage.clear()
         self.start()
@@ -169,15 +245,33 @@ class ObfuscatorManager:
         """
         Thread function to read from process pipe and add timestamps
         
+        Output is read in large chunks and split into lines here, so a burst
+        of output costs one read() and one decode per chunk instead of per line.
+        
         Args:
-            pipe: Process stdout pipe
+            pipe: Process stdout pipe (binary)
             process: Process object
         """
+        fd = pipe.fileno()
+        tail = b''  # Incomplete last line of the previous chunk
         try:
-            for line in iter(pipe.readline, ''):
-                if not line:
+            while True:
+                data = os.read(fd, LOG_READ_CHUNK_SIZE)
+                if not data:
                     break
-                self.log_storage.add_log(line, add_timestamp=True)
+                data = tail + data
+                end = data.rfind(b'\n')
+                if end < 0:
+                    tail = data
+                    continue
+                tail = data[end + 1:]
+                # Only complete lines are decoded, so multi-byte characters are never split
+                self.log_storage.add_logs(
+                    data[:end].decode('utf-8', errors='replace').split('\n'),
+                    add_timestamp=True
+                )
+            if tail:
+                self.log_storage.add_log(tail.decode('utf-8', errors='replace'), add_timestamp=True)
         except Exception as e:
             logger.error(f"Error reading obfuscator logs: {e}")
         finally:
@@ -190,20 +284,21 @@ class ObfuscatorManager:
     
     def get_version(self) -> Optional[str]:
         """
-        Get wg-obfuscator version by running --help command.
-        Version is cached for the lifetime of the container.
+        Get wg-obfuscator version.
+        Version is probed once in the background and cached for the lifetime of the container.
         
         Returns:
             Version string (e.g., "v1.5 (linux/amd64)") or None if not available
+            or not probed yet
         """
-        # Return cached version if available
-        if self._cached_version is not None:
-            return self._cached_version
-        
+        return self._cached_version
+    
+    def _probe_version(self) -> None:
+        """Get wg-obfuscator version by running --help command and cache it"""
         # Try to get version (works even if obfuscator is not running)
         try:
             result = subprocess.run(
-                ["wg-obfuscator", "--help"],
+                [WG_OBFUSCATOR_BIN, "--help"],
                 capture_output=True,
                 text=True,
                 check=False,
@@ -218,12 +313,12 @@ class ObfuscatorManager:
                 # fprintf(stderr, "Starting WireGuard Obfuscator (commit " COMMIT " @ " WG_OBFUSCATOR_GIT_REPO ") (" ARCH ")\n");
                 # fprintf(stderr, "Starting WireGuard Obfuscator v" WG_OBFUSCATOR_VERSION "\n");
                 # fprintf(stderr, "Starting WireGuard Obfuscator v" WG_OBFUSCATOR_VERSION " (" ARCH ")\n");
-                match = re.search(r'Starting WireGuard Obfuscator (.*)', first_line)
+                match = _VERSION_RE.search(first_line)
                 if match:                    
                     version = match.group(1).strip()
                     if version.startswith('(') and version.endswith(')'):
                         # Nighly build version, remove repo URL
-                        match = re.search(r'\((.*)@.*?\)(.*)', version)
+                        match = _NIGHTLY_VERSION_RE.search(version)
                         if match:
                             version = f"{match.group(1).strip()} {match.group(2).strip()}"
                         else:
@@ -231,44 +326,70 @@ class ObfuscatorManager:
                     # Cache the version
                     self._cached_version = version
                     logger.debug(f"Cached obfuscator version: {version}")
-                    return version
-            # Cache None if version couldn't be extracted
-            self._cached_version = None
-            return None
         except Exception as e:
             logger.debug(f"Failed to get obfuscator version: {e}")
-            # Cache None on error
-            self._cached_version = None
-            return None
+    
+    @staticmethod
+    def _iter_obfuscator_processes() -> Iterator[Tuple[int, bool]]:
+        """
+        Find wg-obfuscator processes by scanning /proc
+        
+        Yields:
+            Tuples of (pid, is_zombie)
+        """
+        with os.scandir('/proc') as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f'/proc/{entry.name}/stat', 'rb') as f:
+                        stat = f.read()
+                except OSError:
+                    continue  # Process exited while scanning
+                # Format: "pid (comm) state ...", comm itself may contain ')'
+                name_start = stat.find(b'(')
+                name_end = stat.rfind(b')')
+                if stat[name_start + 1:name_end].decode(errors='replace') != OBFUSCATOR_PROCESS_NAME:
+                    continue
+                state = stat[name_end + 2:name_end + 3]
+                yield int(entry.name), state == b'Z'
+    
+    def invalidate_proc_cache(self) -> None:
+        """Forget the cached process scan result (call after starting or killing)"""
+        self._proc_check_cache = (0.0, False)
+    
+    def _scan_wg_processes(self) -> Tuple[List[int], List[int]]:
+        """
+        Find running and zombie wg-obfuscator processes in a single /proc pass
+        
+        Also refreshes the cached result of _is_process_running().
+        
+        Returns:
+            Tuple of (running_pids, zombie_pids)
+        """
+        running_pids: List[int] = []
+        zombie_pids: List[int] = []
+        for pid, is_zombie in self._iter_obfuscator_processes():
+            (zombie_pids if is_zombie else running_pids).append(pid)
+        self._proc_check_cache = (time.monotonic(), bool(running_pids))
+        return running_pids, zombie_pids
     
     def _is_process_running(self) -> bool:
         """
         Check if wg-obfuscator process is actually running (not zombie)
         
+        The result is reused for PROCESS_CHECK_TTL seconds so that repeated
+        checks within one operation share a single /proc scan.
+        
         Returns:
             True if process is running (not zombie), False otherwise
         """
+        checked_at, running = self._proc_check_cache
+        if time.monotonic() - checked_at < PROCESS_CHECK_TTL:
+            return running
         try:
-            # Use ps to check for running processes (exclude zombies)
-            result = subprocess.run(
-                ["ps", "aux"],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=2
-            )
-            if result.returncode != 0:
-                return False
-            
-            # Check each line for wg-obfuscator
-            for line in result.stdout.split('\n'):
-                if 'wg-obfuscator' in line and 'grep' not in line:
-                    # Check if it's not a zombie (defunct)
-                    if '<defunct>' not in line and 'Z' not in line.split()[7:8]:
-                        # Found a running (non-zombie) process
-                        return True
-            
-            return False
+            running_pids, _ = self._scan_wg_processes()
+            return bool(running_pids)
         except Exception as e:
             logger.debug(f"Failed to check process status: {e}")
             # Fallback to checking our tracked process
@@ -277,39 +398,29 @@ class ObfuscatorManager:
                 return return_code is None  # None means still running
             return False
     
-    def _cleanup_zombie_processes(self) -> None:
-        """Clean up zombie processes by waiting for them"""
+    def _cleanup_zombie_processes(self) -> List[int]:
+        """
+        Clean up zombie processes by waiting for them
+        
+        Returns:
+            PIDs of running (non-zombie) wg-obfuscator processes
+        """
         try:
-            # Find all wg-obfuscator processes (including zombies)
-            result = subprocess.run(
-                ["ps", "aux"],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=2
-            )
-            if result.returncode != 0:
-                return
-            
-            # Extract PIDs of zombie processes
-            for line in result.stdout.split('\n'):
-                if 'wg-obfuscator' in line and 'grep' not in line:
-                    if '<defunct>' in line or 'Z' in line.split()[7:8]:
-                        # Extract PID (second column)
-                        parts = line.split()
-                        if len(parts) > 1:
-                            try:
-                                pid = int(parts[1])
-                                # Try to wait for zombie process (reaps it)
-                                try:
-                                    import os
-                                    os.waitpid(pid, 0)
-                                except (OSError, ChildProcessError):
-                                    pass  # Process may have been cleaned up
-                            except (ValueError, IndexError):
-                                pass
+            running_pids, zombie_pids = self._scan_wg_processes()
         except Exception as e:
             logger.debug(f"Failed to cleanup zombie processes: {e}")
+            # Fallback to our tracked process
+            if self.process is not None and self.process.poll() is None:
+                return [self.process.pid]
+            return []
+        
+        for pid in zombie_pids:
+            try:
+                # Reap the zombie (only possible for our own children)
+                os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                pass  # Not our child or already reaped
+        return running_pids
     
     def status(self, obfuscation_enabled: bool) -> Dict:
         """
@@ -321,7 +432,7 @@ class ObfuscatorManager:
         Returns:
             Dictionary with status information
         """
-        # Always get version (cached, so no performance impact)
+        # Always get version (probed in background, so no performance impact)
         version = self.get_version()
         
         if not obfuscation_enabled:
@@ -383,22 +494,10 @@ class ObfuscatorManager:
         """
         Extract error message from recent logs
         
-        Looks for pattern: [main][E] error message
+        Looks for pattern: [main][E] error message (tracked by the log storage
+        as lines are added)
         
         Returns:
             Error message string or None if not found
         """
-        # Check last 50 lines for error messages
-        recent_logs = self.log_storage.get_logs(50)
-        for log_line in reversed(recent_logs):
-            # Look for pattern: [main][E] error message
-            if "[main][E]" in log_line:
-                # Extract error message after [main][E]
-                try:
-                    parts = log_line.split("[main][E]")
-                    if len(parts) > 1:
-                        return parts[1].strip()
-                except Exception:
-                    pass
-        return None
-
+        return self.log_storage.get_last_error()
@@ -18,6 +18,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """Service orchestration for applying configuration changes"""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from .wireguard.config import WireGuardConfigGenerator
@@ -47,9 +48,16 @@ class ServiceManager:
         self.obfuscator_manager = obfuscator_manager
         self.external_ip = external_ip
         self.external_port = external_port
+        # Whether generate_configs() changed any file (assume so until it runs)
+        self._configs_changed = True
     
-    def generate_configs(self) -> None:
-        """Generate both WireGuard and obfuscator configuration files"""
+    def generate_configs(self) -> bool:
+        """
+        Generate both WireGuard and obfuscator configuration files
+        
+        Returns:
+            True if any configuration file changed
+        """
         config = self.config_manager.main
         clients = self.config_manager.clients
         
@@ -60,7 +68,7 @@ class ServiceManager:
             external_port=self.external_port,
             obfuscation=config.get('obfuscation', False)
         )
-        WireGuardConfigGenerator.save_config_file(
+        changed = WireGuardConfigGenerator.save_config_file(
             wg_config_content,
             config['wg_interface']
         )
@@ -74,19 +82,42 @@ class ServiceManager:
                 masking_forced=config.get('masking_forced', False),
                 verbosity_level=config.get('verbosity_level', 'INFO')
             )
-            ObfuscatorConfigGenerator.save_config_file(obf_config_content)
+            changed = ObfuscatorConfigGenerator.save_config_file(obf_config_content) or changed
         
         logger.debug("Generated WireGuard and obfuscator configuration files")
+        self._configs_changed = changed
+        return changed
     
-    def restart_services(self) -> None:
-        """Restart WireGuard and obfuscator services"""
+    def _services_up_to_date(self) -> bool:
+        """Check if running services already match the configuration"""
+        config = self.config_manager.main
+        enabled = config.get('enabled', True)
+        obfuscation = enabled and config.get('obfuscation', False)
+        
+        wg_running = self.wg_manager.status()["running"]
+        obfuscator_running = self.obfuscator_manager.status(True)["running"]
+        return wg_running == enabled and obfuscator_running == obfuscation
+    
+    def restart_services(self, force: bool = False) -> None:
+        """
+        Restart WireGuard and obfuscator services
+        
+        Args:
+            force: Restart even if the configuration files did not change
+                and the services are already in the expected state
+        """
         config = self.config_manager.main
         
-        # Stop obfuscator first
-        self.obfuscator_manager.stop()
+        if not force and not self._configs_changed and self._services_up_to_date():
+            logger.info("Configuration unchanged, services not restarted")
+            return
         
-        # Stop WireGuard
-        self.wg_manager.stop()
+        # Stop obfuscator and WireGuard concurrently (they do not depend on each other)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            obfuscator_stop = executor.submit(self.obfuscator_manager.stop)
+            wg_stop = executor.submit(self.wg_manager.stop)
+            obfuscator_stop.result()
+            wg_stop.result()
         
         # Only start services if WireGuard is enabled
         if config.get('enabled', True):
@@ -18,21 +18,89 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """Utility functions"""
 
 import os
+import ipaddress
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import secrets
 import string
+import time
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from .config.constants import EXTERNAL_IP_FILE, DEFAULT_ADMIN_USERNAME, DEFAULT_ADMIN_PASSWORD
 from .exceptions import ConfigError
-from .api.system import get_current_timezone, set_system_timezone
+from .auth.password import hash_password
+from .wireguard.keys import generate_key_pair
 from .database import get_config_value
 
 logger = logging.getLogger(__name__)
 
+# Services queried concurrently for the external IPv4 address; the first valid answer wins
+# (IPv4-only endpoints, so dual-stack hosts always get the same address family)
+EXTERNAL_IP_SERVICES = (
+    "https://ipv4.icanhazip.com",
+    "https://api.ipify.org",
+    "http://ifconfig.me/ip",
+)
+# (connect, read) timeouts for each external IP service request
+EXTERNAL_IP_TIMEOUT = (2, 5)
+
+# Shared HTTP session for external IP lookups: keeps connections (and TLS sessions)
+# to each service alive between lookups and retries transient failures
+_http_session = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=len(EXTERNAL_IP_SERVICES),
+    pool_maxsize=1,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+)
+_http_session.mount("http://", _http_adapter)
+_http_session.mount("https://", _http_adapter)
+
+# Characters used in generated obfuscation keys
+_OBF_ALPHABET = (string.ascii_letters + string.digits + '!@#$%^&*()_+-=[]{}|;:,.<>?').encode()
+# Random bytes are mapped onto the alphabet with bytes.translate(); bytes at or above
+# the largest multiple of the alphabet size are dropped so every character is equally likely
+_OBF_TABLE = bytes(_OBF_ALPHABET[b % len(_OBF_ALPHABET)] for b in range(256))
+_OBF_REJECT = bytes(range(256 - 256 % len(_OBF_ALPHABET), 256))
+
+# How long a resolved external IP is reused (seconds)
+EXTERNAL_IP_CACHE_TTL = 900
+
+# (monotonic timestamp, IP) of the last successful external IP lookup
+_external_ip_cache: Tuple[float, Optional[str]] = (0.0, None)
+
+
+def invalidate_external_ip_cache() -> None:
+    """Forget the cached external IP so the next get_external_ip() call resolves it again"""
+    global _external_ip_cache
+    _external_ip_cache = (0.0, None)
+
 
 def get_external_ip() -> str:
+    """
+    Get external IP address, reusing the last result for EXTERNAL_IP_CACHE_TTL seconds
+    
+    Returns:
+        External IP address as string
+        
+    Raises:
+        ConfigError: If IP cannot be obtained
+    """
+    global _external_ip_cache
+    cached_at, cached_ip = _external_ip_cache
+    now = time.monotonic()
+    if cached_ip and now - cached_at < EXTERNAL_IP_CACHE_TTL:
+        return cached_ip
+    
+    ip = _resolve_external_ip()
+    _external_ip_cache = (now, ip)
+    return ip
+
+
+def _resolve_external_ip() -> str:
     """
     Get external IP address from environment variable, file, or external service
     
@@ -48,26 +116,32 @@ def get_external_ip() -> str:
         logger.info(f"Got external IP from environment variable: {ip}")
         return ip
     
-    # Try reading from file
-    if os.path.exists(EXTERNAL_IP_FILE):
+    # Try reading from file (an IP address is at most 45 characters)
+    try:
+        fd = os.open(EXTERNAL_IP_FILE, os.O_RDONLY)
         try:
-            with open(EXTERNAL_IP_FILE, "r") as f:
-                ip = f.read().strip()
-            if ip:
-                logger.info(f"Got external IP from file: {ip}")
-                return ip
-        except Exception as e:
-            logger.warning(f"Failed to read IP from file: {e}")
+            ip = os.read(fd, 64).decode().strip()
+        finally:
+            os.close(fd)
+        if ip:
+            logger.info(f"Got external IP from file: {ip}")
+            return ip
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to read IP from file: {e}")
     
     # Try getting from external service
     try:
-        response = requests.get("http://ifconfig.me", timeout=10)
-        ip = response.text.strip()
+        ip = _fetch_external_ip()
         if ip:
             # Save IP to file
             try:
-                with open(EXTERNAL_IP_FILE, "w") as f:
-                    f.write(ip)
+                fd = os.open(EXTERNAL_IP_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                try:
+                    os.write(fd, ip.encode())
+                finally:
+                    os.close(fd)
             except Exception as e:
                 logger.warning(f"Failed to save IP to file: {e}")
             logger.info(f"Got external IP from external service: {ip}")
@@ -78,10 +152,45 @@ def get_external_ip() -> str:
     raise ConfigError("Failed to get external IP address")
 
 
+def _fetch_external_ip_from(url: str) -> str:
+    """Query a single external IP service and validate its answer"""
+    response = _http_session.get(url, timeout=EXTERNAL_IP_TIMEOUT)
+    response.raise_for_status()
+    ip = response.text.strip()
+    # Raises ValueError on anything that is not an IPv4 address (ifconfig.me may answer over IPv6)
+    ipaddress.IPv4Address(ip)
+    return ip
+
+
+def _fetch_external_ip() -> Optional[str]:
+    """
+    Query all external IP services concurrently
+    
+    Returns:
+        IP address from the first service that answered with a valid one,
+        or None if all of them failed
+    """
+    executor = ThreadPoolExecutor(max_workers=len(EXTERNAL_IP_SERVICES))
+    try:
+        futures = {executor.submit(_fetch_external_ip_from, url): url for url in EXTERNAL_IP_SERVICES}
+        for future in as_completed(futures):
+            try:
+                return future.result()
+            except Exception as e:
+                logger.warning(f"Failed to get external IP from {futures[future]}: {e}")
+        return None
+    finally:
+        # Do not wait for slower services once an answer is known
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=1)
 def get_external_port() -> int:
     """
     Get external port from environment variable
     
+    The parsed value is cached; call get_external_port.cache_clear() to re-read it.
+    
     Returns:
         External port number
         
@@ -96,7 +205,7 @@ def get_external_port() -> int:
         port = int(external_port)
         if port < 1 or port > 65535:
             raise ValueError("Port out of range")
-        logger.info(f"Got external port: {port}")
+        logger.debug("Got external port: %d", port)
         return port
     except ValueError as e:
         raise ConfigError(f"Invalid EXTERNAL_PORT value: {external_port}")
@@ -112,7 +221,10 @@ def generate_obfuscation_key(length: int = 64) -> str:
     Returns:
         Random ASCII string
     """
-    return ''.join(secrets.choice(string.ascii_letters + string.digits + '!@#$%^&*()_+-=[]{}|;:,.<>?') for _ in range(length))
+    key = b''
+    while len(key) < length:
+        key += secrets.token_bytes(length * 2).translate(_OBF_TABLE, _OBF_REJECT)
+    return key[:length].decode()
 
 
 def initialize_config(config_manager) -> None:
@@ -126,42 +238,41 @@ def initialize_config(config_manager) -> None:
     admin_username = os.getenv("ADMIN_USERNAME", DEFAULT_ADMIN_USERNAME)
     admin_password = os.getenv("ADMIN_PASSWORD", DEFAULT_ADMIN_PASSWORD)
     
-    from .auth.password import hash_password
+    changed = False
     
     # Store admin credentials hash if not exists
     if "admin_password_hash" not in config_manager.main:
         config_manager.main["admin_password_hash"] = hash_password(admin_password)
         config_manager.main["admin_username"] = admin_username
+        changed = True
         logger.info("Initialized admin credentials")
     
     if "admin_username" not in config_manager.main:
         config_manager.main["admin_username"] = admin_username
+        changed = True
         logger.info("Set admin username")
     
     # Create server keys if they don't exist
     if "server_private_key" not in config_manager.main or "server_public_key" not in config_manager.main:
         logger.info("Generating server key pair...")
-        from .clients.manager import ClientManager
-        # We need a temporary client manager to generate keys
-        # For now, we'll generate them directly
-        import subprocess
         try:
-            response = subprocess.run(["wg", "genkey"], capture_output=True, text=True, check=True)
-            private = response.stdout.splitlines()[0]
-            response_public = subprocess.run(["wg", "pubkey"], input=private, capture_output=True, text=True, check=True)
-            public = response_public.stdout.splitlines()[0]
+            private, public = generate_key_pair()
             config_manager.main["server_private_key"] = private
             config_manager.main["server_public_key"] = public
+            changed = True
             logger.info("Generated server key pair")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             raise ConfigError(f"Failed to generate server keys: {e}")
     
     # Generate obfuscation key if not exists
     if "obfuscation_key" not in config_manager.main:
         config_manager.main["obfuscation_key"] = generate_obfuscation_key()
+        changed = True
         logger.info("Generated obfuscation key")
     
-    config_manager.save_config()
+    # Nothing to persist on a regular restart with an already initialized database
+    if changed:
+        config_manager.save_config()
 
 
 def check_and_set_system_timezone() -> bool:
@@ -171,6 +282,9 @@ def check_and_set_system_timezone() -> bool:
     Returns:
         True if timezone was changed, False otherwise.
     """
+    # Imported here to avoid loading Flask (via the API package) at import time
+    from .api.system import get_current_timezone, set_system_timezone
+    
     try:
         saved_timezone = get_config_value("system_timezone")
         if not saved_timezone:
@@ -20,7 +20,8 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .manager import WireGuardManager
 from .config import WireGuardConfigGenerator
-from .stats import WireGuardStats
+from .stats import WireGuardStats, PeerInfo
+from .keys import generate_key_pair
 
-__all__ = ['WireGuardManager', 'WireGuardConfigGenerator', 'WireGuardStats']
+__all__ = ['WireGuardManager', 'WireGuardConfigGenerator', 'WireGuardStats', 'PeerInfo', 'generate_key_pair']
 
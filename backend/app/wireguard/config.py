@@ -17,6 +17,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """WireGuard configuration file generation"""
 
+import os
 import logging
 from typing import Dict, List
 
@@ -132,16 +133,34 @@ class WireGuardConfigGenerator:
         return config_content
     
     @staticmethod
-    def save_config_file(config_content: str, wg_interface: str) -> None:
+    def save_config_file(config_content: str, wg_interface: str) -> bool:
         """
         Save WireGuard configuration to file
         
         Args:
             config_content: Configuration file content
             wg_interface: WireGuard interface name
+            
+        Returns:
+            True if the file content changed, False if it was already up to date
         """
         config_path = f"/etc/wireguard/{wg_interface}.conf"
-        with open(config_path, "w") as f:
+        try:
+            with open(config_path, "r") as f:
+                if f.read() == config_content:
+                    logger.debug(f"WireGuard config {config_path} is up to date")
+                    return False
+        except OSError:
+            pass  # No config file yet
+        
+        # Write to a temporary file and rename it over the old one, so
+        # wg-quick never sees a partially written config
+        tmp_path = f"{config_path}.tmp"
+        with open(tmp_path, "w") as f:
             f.write(config_content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, config_path)
         logger.debug(f"Saved WireGuard config to {config_path}")
+        return True
 
@@ -0,0 +1,73 @@
+"""
+Copyright (C) 2025 Alexey Cluster <cluster@cluster.wtf>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+"""WireGuard key generation"""
+
+import base64
+import logging
+import subprocess
+from typing import Tuple
+
+try:
+    from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+    from cryptography.hazmat.primitives.serialization import (
+        Encoding, NoEncryption, PrivateFormat, PublicFormat
+    )
+except ImportError:
+    # Fall back to wireguard-tools when python3-cryptography is not installed
+    X25519PrivateKey = None
+
+logger = logging.getLogger(__name__)
+
+
+def generate_key_pair() -> Tuple[str, str]:
+    """
+    Generate WireGuard (X25519) key pair
+    
+    Keys are generated in-process when the cryptography package is available,
+    otherwise with "wg genkey" and "wg pubkey". Both produce base64-encoded
+    raw 32-byte values.
+    
+    Returns:
+        Tuple of (private_key, public_key)
+        
+    Raises:
+        subprocess.CalledProcessError: If the wg fallback fails
+    """
+    if X25519PrivateKey is None:
+        return _generate_key_pair_wg()
+    
+    private_key = X25519PrivateKey.generate()
+    private = base64.b64encode(
+        private_key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+    ).decode()
+    public = base64.b64encode(
+        private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    ).decode()
+    return private, public
+
+
+def _generate_key_pair_wg() -> Tuple[str, str]:
+    """Generate key pair with wg, deriving the public key in the same shell process"""
+    response = subprocess.run(
+        ["sh", "-c", 'set -e; k=$(wg genkey); p=$(printf "%s" "$k" | wg pubkey); printf "%s\\n%s\\n" "$k" "$p"'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    private, public = response.stdout.splitlines()[:2]
+    return private, public
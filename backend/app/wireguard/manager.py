@@ -17,27 +17,41 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """WireGuard service management"""
 
+import os
 import subprocess
+import time
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from ..config.constants import INTERNAL_WG_PORT
 from ..exceptions import ServiceError
 
 logger = logging.getLogger(__name__)
 
+# How long a "wg show" status result is reused (seconds)
+STATUS_CACHE_TTL = 0.5
+
 
 class WireGuardManager:
     """Manages WireGuard service operations"""
     
     def __init__(self, wg_interface: str = "wg0"):
         self.wg_interface = wg_interface
+        # (monotonic timestamp, status) of the last "wg show" check
+        self._status_cache: Tuple[float, Optional[Dict]] = (0.0, None)
+    
+    def invalidate_status_cache(self) -> None:
+        """Forget the cached status (call after bringing the interface up or down)"""
+        self._status_cache = (0.0, None)
+    
+    def _iface_exists(self) -> bool:
+        """Check if the network interface exists without running wg"""
+        return os.path.isdir(f"/sys/class/net/{self.wg_interface}")
     
     def stop(self) -> None:
         """Stop WireGuard interface"""
         # Check if already stopped
-        status = self.status()
-        if not status["running"]:
+        if not self._iface_exists():
             return
         
         try:
@@ -47,6 +61,7 @@ class WireGuardManager:
                 stdout=subprocess.DEVNULL,
                 check=False
             )
+            self.invalidate_status_cache()
             logger.info(f"Stopped WireGuard interface {self.wg_interface}")
         except Exception as e:
             logger.warning(f"Error stopping WireGuard: {e}")
@@ -60,8 +75,10 @@ class WireGuardManager:
                 text=True,
                 check=True
             )
+            self.invalidate_status_cache()
             logger.info(f"Started WireGuard interface {self.wg_interface}")
         except subprocess.CalledProcessError as e:
+            self.invalidate_status_cache()
             error_msg = e.stderr if e.stderr else "Unknown error"
             logger.error(f"Failed to start WireGuard: {error_msg}")
             raise ServiceError(f"Failed to start WireGuard: {error_msg}")
@@ -76,9 +93,17 @@ class WireGuardManager:
         """
         Check if WireGuard interface is running
         
+        The result is reused for STATUS_CACHE_TTL seconds so that checks made
+        in quick succession share a single "wg show" call.
+        
         Returns:
             Dictionary with 'running' (bool) and 'error' (str or None)
         """
+        checked_at, cached_status = self._status_cache
+        now = time.monotonic()
+        if cached_status is not None and now - checked_at < STATUS_CACHE_TTL:
+            return dict(cached_status)
+        
         try:
             result = subprocess.run(
                 ["wg", "show", self.wg_interface],
@@ -88,10 +113,12 @@ class WireGuardManager:
             )
             is_running = result.returncode == 0
             error = None if is_running else "Interface not found or not running"
-            return {
+            status = {
                 "running": is_running,
                 "error": error
             }
+            self._status_cache = (now, status)
+            return dict(status)
         except Exception as e:
             logger.error(f"Error checking WireGuard status: {e}")
             return {
@@ -20,7 +20,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import subprocess
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 from ..config.constants import HANDSHAKE_TIMEOUT
 from ..exceptions import ServiceError
@@ -28,6 +28,18 @@ from ..exceptions import ServiceError
 logger = logging.getLogger(__name__)
 
 
+class PeerInfo(NamedTuple):
+    """Statistics of a single WireGuard peer (use _asdict() to serialize)"""
+    public_key: str
+    client_name: Optional[str]
+    endpoint: Optional[str]
+    allowed_ips: str
+    latest_handshake: int
+    transfer_rx_bytes: int  # Client incoming (server outgoing)
+    transfer_tx_bytes: int  # Client outgoing (server incoming)
+    is_connected: bool
+
+
 class WireGuardStats:
     """Collects and parses WireGuard statistics"""
     
@@ -42,38 +54,47 @@ class WireGuardStats:
             clients: Optional clients dictionary to map public keys to usernames
             
         Returns:
-            Dictionary with interface name and peers statistics, or None if interface not found
+            Dictionary with interface name and list of PeerInfo, or None if interface not found
         """
         try:
-            # Get stats in dump format
-            result = subprocess.run(
-                ["wg", "show", self.wg_interface, "dump"],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            if result.returncode != 0:
-                logger.warning(f"WireGuard interface {self.wg_interface} not found or not running")
-                return None
-            
             stats = {
                 "interface": self.wg_interface,
                 "peers": []
             }
+            # Bind loop invariants to locals: same reference time for all peers
+            now = time.time()
+            handshake_timeout = HANDSHAKE_TIMEOUT
+            append_peer = stats["peers"].append
+            # Map public keys to client names once instead of searching per peer
+            pk_to_name = {
+                client.get('public_key'): name
+                for name, client in (clients or {}).items()
+                if client.get('public_key')
+            }
             
-            # Parse wg dump output format: public_key, preshared_key, endpoint, allowed_ips, 
-            # latest_handshake, transfer_rx, transfer_tx, persistent_keepalive
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-                parts = line.split('\t')
-                if len(parts) >= 6:
-                    public_key = parts[0]
-                    endpoint = parts[2] if len(parts) > 2 and parts[2] != '(none)' else None
-                    allowed_ips = parts[3] if len(parts) > 3 else ""
-                    latest_handshake = int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else 0
-                    transfer_rx = int(parts[5]) if len(parts) > 5 and parts[5].isdigit() else 0
-                    transfer_tx = int(parts[6]) if len(parts) > 6 and parts[6].isdigit() else 0
+            # Get stats in dump format, parsing lines as wg writes them
+            # instead of buffering the whole output
+            with subprocess.Popen(
+                ["wg", "show", self.wg_interface, "dump"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1 << 16
+            ) as proc:
+                # Parse wg dump output format: public_key, preshared_key, endpoint, allowed_ips, 
+                # latest_handshake, transfer_rx, transfer_tx, persistent_keepalive
+                for line in proc.stdout:
+                    try:
+                        (public_key, _, endpoint, allowed_ips,
+                         latest_handshake, transfer_rx, transfer_tx, *_) = line.rstrip('\n').split('\t')
+                        latest_handshake = int(latest_handshake)
+                        transfer_rx = int(transfer_rx)
+                        transfer_tx = int(transfer_tx)
+                    except ValueError:
+                        # Interface line (fewer fields), empty or malformed line
+                        continue
+                    if endpoint == '(none)':
+                        endpoint = None
                     
                     # Swap rx/tx from server perspective to client perspective
                     # transfer_rx (server received = client sent) -> client tx (outgoing)
@@ -82,31 +103,29 @@ class WireGuardStats:
                     client_tx_bytes = transfer_rx  # Client sends what server receives
                     
                     # Find client name by public key
-                    client_name = None
-                    if clients:
-                        for name, client in clients.items():
-                            if client.get('public_key') == public_key:
-                                client_name = name
-                                break
+                    client_name = pk_to_name.get(public_key)
                     
                     # Check if connected (handshake within timeout)
                     is_connected = latest_handshake > 0 and (
-                        time.time() - latest_handshake < HANDSHAKE_TIMEOUT
+                        now - latest_handshake < handshake_timeout
                     )
                     
-                    peer_info = {
-                        "public_key": public_key,
-                        "client_name": client_name,
-                        "endpoint": endpoint,
-                        "allowed_ips": allowed_ips,
-                        "latest_handshake": latest_handshake,
-                        "transfer_rx_bytes": client_rx_bytes,  # Client incoming (server outgoing)
-                        "transfer_tx_bytes": client_tx_bytes,  # Client outgoing (server incoming)
-                        "is_connected": is_connected
-                    }
-                    stats["peers"].append(peer_info)
+                    append_peer(PeerInfo(
+                        public_key,
+                        client_name,
+                        endpoint,
+                        allowed_ips,
+                        latest_handshake,
+                        client_rx_bytes,
+                        client_tx_bytes,
+                        is_connected
+                    ))
+            
+            if proc.returncode != 0:
+                logger.warning(f"WireGuard interface {self.wg_interface} not found or not running")
+                return None
             
-            logger.debug(f"Collected stats for {len(stats['peers'])} peers")
+            logger.debug("Collected stats for %d peers", len(stats["peers"]))
             return stats
         except Exception as e:
             logger.error(f"Failed to get WireGuard statistics: {e}")
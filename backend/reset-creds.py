@@ -1,6 +1,8 @@
 import sqlite3
 import sys
 import hashlib
+import secrets
+import json
 from datetime import datetime
 
 try:
@@ -9,33 +11,38 @@ try:
         print("Error: Password is empty", file=sys.stderr)
         sys.exit(1)
 
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
+    # Same "scrypt$<salt hex>$<hash hex>" format as app/auth/password.py
+    salt = secrets.token_bytes(16)
+    derived = hashlib.scrypt(password.encode(), salt=salt, n=2**15, r=8, p=1,
+                             maxmem=64 * 1024 * 1024, dklen=32)
+    password_hash = f"scrypt${salt.hex()}${derived.hex()}"
     now = datetime.now().isoformat()
 
     db_path = "/config/wg-easy.db"
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Update admin username
-        cursor.execute("""
-            INSERT INTO config (key, value, updated_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(key) DO UPDATE SET value=?, updated_at=?
-        """, ("admin_username", "admin", now, "admin", now))
-
-        # Update admin password hash
-        cursor.execute("""
-            INSERT INTO config (key, value, updated_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(key) DO UPDATE SET value=?, updated_at=?
-        """, ("admin_password_hash", password_hash, now, password_hash, now))
-
-        # Delete all tokens
-        cursor.execute("DELETE FROM tokens")
-
-        conn.commit()
+        # Transactions are controlled explicitly below; wait for the running service's locks
+        conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+        # Same journal settings as the service, so its readers are not blocked while we write
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Commit both updates and the token cleanup together, or roll back on error
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Update admin username and password hash
+            cursor.executemany("""
+                INSERT INTO config (key, value, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+            """, [
+                ("admin_username", json.dumps("admin"), now),
+                ("admin_password_hash", json.dumps(password_hash), now),
+            ])
+
+            # Delete all tokens
+            cursor.execute("DELETE FROM tokens")
         conn.close()
         print("Successfully reset admin credentials", file=sys.stdout)
 